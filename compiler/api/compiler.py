@@ -215,9 +215,11 @@ def start(format: bool = False):
         schema = (f1.read() + f2.read() + f3.read()).splitlines()
 
     with open(HOME_PATH / "template/type.txt") as f1, \
-        open(HOME_PATH / "template/combinator.txt") as f2:
+        open(HOME_PATH / "template/combinator.txt") as f2, \
+        open(HOME_PATH / "template/namespace.txt") as f3:
         type_tmpl = f1.read()
         combinator_tmpl = f2.read()
+        namespace_tmpl = f3.read()
 
     with open(NOTICE_PATH, encoding="utf-8") as f:
         notice = []
@@ -453,6 +455,7 @@ def start(format: bool = False):
                              f"            " + references
 
         write_types = read_types = "" if c.has_flags else "# No flags\n        "
+        skip_types = []
 
         for arg_name, arg_type in c.args:
             flag = FLAGS_RE_2.match(arg_type)
@@ -481,6 +484,7 @@ def start(format: bool = False):
 
                 write_types += write_flags
                 read_types += f"\n        {arg_name} = Int.read(b)\n        "
+                skip_types.append(f"{arg_name} = Int.read(b)")
 
                 continue
 
@@ -497,26 +501,34 @@ def start(format: bool = False):
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = {flag_type.title()}.read(b) if flags{number} & (1 << {index}) else None"
+
+                    skip_types.append(f"if flags{number} & (1 << {index}):\n            {flag_type.title()}.skip(b)")
                 elif "vector" in flag_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
                     write_types += "\n        "
                     write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
+                    write_types += "Vector.write_into(b, self.{}{})\n        ".format(
                         arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
                     )
 
                     read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{}) if flags{} & (1 << {}) else []\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else "", number, index
+                    read_types += "{} = TLObject.read(b, {}) if flags{} & (1 << {}) else []\n        ".format(
+                        arg_name, sub_type.title() if sub_type in CORE_TYPES else "TLObject", number, index
                     )
+
+                    skip_types.append("if flags{} & (1 << {}):\n            TLObject.skip(b, {})".format(
+                        number, index, sub_type.title() if sub_type in CORE_TYPES else "TLObject"
+                    ))
                 else:
                     write_types += "\n        "
                     write_types += f"if self.{arg_name} is not None:\n            "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
+                    write_types += f"self.{arg_name}.write_into(b)\n        "
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b) if flags{number} & (1 << {index}) else None\n        "
+
+                    skip_types.append(f"if flags{number} & (1 << {index}):\n            TLObject.skip(b)")
             else:
                 if arg_type in CORE_TYPES:
                     write_types += "\n        "
@@ -524,25 +536,33 @@ def start(format: bool = False):
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = {arg_type.title()}.read(b)\n        "
+
+                    skip_types.append(f"{arg_type.title()}.skip(b)")
                 elif "vector" in arg_type.lower():
                     sub_type = arg_type.split("<")[1][:-1]
 
                     write_types += "\n        "
-                    write_types += "b.write(Vector(self.{}{}))\n        ".format(
+                    write_types += "Vector.write_into(b, self.{}{})\n        ".format(
                         arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
                     )
 
                     read_types += "\n        "
-                    read_types += "{} = TLObject.read(b{})\n        ".format(
-                        arg_name, f", {sub_type.title()}" if sub_type in CORE_TYPES else ""
+                    read_types += "{} = TLObject.read(b, {})\n        ".format(
+                        arg_name, sub_type.title() if sub_type in CORE_TYPES else "TLObject"
                     )
+
+                    skip_types.append("TLObject.skip(b, {})".format(
+                        sub_type.title() if sub_type in CORE_TYPES else "TLObject"
+                    ))
                 else:
                     write_types += "\n        "
-                    write_types += f"b.write(self.{arg_name}.write())\n        "
+                    write_types += f"self.{arg_name}.write_into(b)\n        "
 
                     read_types += "\n        "
                     read_types += f"{arg_name} = TLObject.read(b)\n        "
 
+                    skip_types.append("TLObject.skip(b)")
+
         slots = ", ".join([f'"{i[0]}"' for i in sorted_args])
         return_arguments = ", ".join([f"{i[0]}={i[0]}" for i in sorted_args])
 
@@ -557,6 +577,7 @@ def start(format: bool = False):
             arguments=arguments,
             fields=fields,
             read_types=read_types,
+            skip_types="\n        ".join(skip_types) or "pass",
             write_types=write_types,
             return_arguments=return_arguments
         )
@@ -582,26 +603,13 @@ def start(format: bool = False):
 
         d[c.namespace].append(c.name)
 
-    for namespace, types in namespaces_to_types.items():
-        with open(DESTINATION_PATH / "base" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
-
-            for t in types:
-                module = t
-
-                if module == "Updates":
-                    module = "UpdatesT"
-
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_types))}")
-
-    for namespace, types in namespaces_to_constructors.items():
-        with open(DESTINATION_PATH / "types" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
+    for section, namespaces in [
+        ("base", namespaces_to_types),
+        ("types", namespaces_to_constructors),
+        ("functions", namespaces_to_functions)
+    ]:
+        for namespace, types in namespaces.items():
+            modules = {}
 
             for t in types:
                 module = t
@@ -609,26 +617,25 @@ def start(format: bool = False):
                 if module == "Updates":
                     module = "UpdatesT"
 
-                f.write(f"from .{snake(module)} import {t}\n")
-
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_constructors))}\n")
-
-    for namespace, types in namespaces_to_functions.items():
-        with open(DESTINATION_PATH / "functions" / namespace / "__init__.py", "w") as f:
-            f.write(f"{notice}\n\n")
-            f.write(f"{WARNING}\n\n")
+                modules[t] = snake(module)
 
-            for t in types:
-                module = t
+            sub_namespaces = [] if namespace else list(filter(bool, namespaces))
 
-                if module == "Updates":
-                    module = "UpdatesT"
+            imports = [f"from .{m} import {t}" for t, m in modules.items()]
 
-                f.write(f"from .{snake(module)} import {t}\n")
+            if sub_namespaces:
+                imports.append(f"from . import {', '.join(sub_namespaces)}")
 
-            if not namespace:
-                f.write(f"from . import {', '.join(filter(bool, namespaces_to_functions))}")
+            with open(DESTINATION_PATH / section / namespace / "__init__.py", "w") as f:
+                f.write(
+                    namespace_tmpl.format(
+                        notice=notice,
+                        warning=WARNING,
+                        imports="\n    ".join(imports),
+                        modules="\n    ".join(f'"{t}": "{m}",' for t, m in modules.items()),
+                        namespaces=", ".join(f'"{n}"' for n in sub_namespaces)
+                    )
+                )
 
     with open(DESTINATION_PATH / "all.py", "w", encoding="utf-8") as f:
         f.write(notice + "\n\n")
@@ -407,6 +407,7 @@ def pyrogram_api():
         Advanced
             invoke
             resolve_peer
+            resolve_peers
             get_file
             save_file
         """
@@ -21,8 +21,6 @@ __version__ = "2.2.4"
 __license__ = "GNU Lesser General Public License v3.0 (LGPL-3.0)"
 __copyright__ = "Copyright (C) 2017-present Dan <https://github.com/delivrance>"
 
-from concurrent.futures.thread import ThreadPoolExecutor
-
 
 class StopTransmission(Exception):
     pass
@@ -39,7 +37,8 @@ class ContinuePropagation(StopAsyncIteration):
 from . import raw, types, filters, handlers, emoji, enums
 from .client import Client
 from .sync import idle, compose
+from .crypto.executor import CryptoExecutor
 
 __version__ = f"{__version__}-TL-{raw.all.layer}"
 
-crypto_executor = ThreadPoolExecutor(1, thread_name_prefix="CryptoWorker")
+crypto_executor = CryptoExecutor()
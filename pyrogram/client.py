@@ -51,7 +51,7 @@ from pyrogram.errors import (
 from pyrogram.handlers.handler import Handler
 from pyrogram.methods import Methods
 from pyrogram.session import Auth, Session
-from pyrogram.storage import Storage, FileStorage, MemoryStorage
+from pyrogram.storage import Storage, FileStorage, MemoryStorage, PeerCache, UpdateStateTracker
 from pyrogram.types import User, TermsOfService
 from pyrogram.utils import ainput
 from .connection import Connection
@@ -60,7 +60,7 @@ from .dispatcher import Dispatcher
 from .file_id import FileId, FileType, ThumbnailSource
 from .mime_types import mime_types
 from .parser import Parser
-from .session.internals import MsgId
+from .session.internals import DataCenterManager, MsgId
 
 log = logging.getLogger(__name__)
 
@@ -202,6 +202,15 @@ class Client(Methods):
             Set the maximum size of the message cache.
             Defaults to 10000.
 
+        max_peer_cache_size (``int``, *optional*):
+            Set the maximum amount of resolved peers kept in memory in front of the storage engine.
+            Defaults to 10000.
+
+        connections (``int``, *optional*):
+            Set the amount of connections kept to the main DC. Requests are spread across them, so that a slow
+            response doesn't hold back the others. Useful for bots with a lot of concurrent requests.
+            Defaults to 1.
+
         storage_engine (:obj:`~pyrogram.storage.Storage`, *optional*):
             Pass an instance of your own implementation of session storage engine.
             Useful when you want to store your session in databases like Mongo, Redis, etc.
@@ -247,6 +256,9 @@ class Client(Methods):
     MAX_CONCURRENT_TRANSMISSIONS = 1
     MAX_CACHE_SIZE = 10000
 
+    # Seconds during which a peer the server failed to resolve is not asked for again
+    RESOLVE_PEER_FAILURE_TTL = 30
+
     mimetypes = MimeTypes()
     mimetypes.readfp(StringIO(mime_types))
 
@@ -282,6 +294,8 @@ class Client(Methods):
         max_concurrent_transmissions: int = MAX_CONCURRENT_TRANSMISSIONS,
         max_message_cache_size: int = MAX_CACHE_SIZE,
         max_business_user_connection_cache_size: int = MAX_CACHE_SIZE,
+        max_peer_cache_size: int = MAX_CACHE_SIZE,
+        connections: int = 1,
         storage_engine: Storage = None,
         no_joined_notifications: bool = False,
         client_platform: enums.ClientPlatform = enums.ClientPlatform.OTHER,
@@ -321,6 +335,8 @@ class Client(Methods):
         self.max_concurrent_transmissions = max_concurrent_transmissions
         self.max_message_cache_size = max_message_cache_size
         self.max_business_user_connection_cache_size = max_business_user_connection_cache_size
+        self.max_peer_cache_size = max_peer_cache_size
+        self.connections = connections
         self.no_joined_notifications = no_joined_notifications
         self.client_platform = client_platform
         self._un_docu_gnihts = _un_docu_gnihts
@@ -338,6 +354,13 @@ class Client(Methods):
         else:
             self.storage = FileStorage(self.name, self.WORKDIR)
 
+        self.peer_cache = PeerCache(self.storage, self.max_peer_cache_size)
+        self.update_state_tracker = UpdateStateTracker(self.storage)
+        self.dc_manager = DataCenterManager(self.storage)
+
+        self.resolve_peer_tasks = {}
+        self.resolve_peer_failures = {}
+
         self.dispatcher = Dispatcher(self)
         self.rnd_id = MsgId
         self.parser = Parser(self)
@@ -604,7 +627,7 @@ class Client(Methods):
 
             parsed_peers.append((peer_id, access_hash, peer_type, usernames, phone_number))
 
-        await self.storage.update_peers(parsed_peers)
+        await self.peer_cache.update_peers(parsed_peers)
 
         return is_min
 
@@ -633,7 +656,7 @@ class Client(Methods):
                 pts_count = getattr(update, "pts_count", None)
 
                 if pts and not self.skip_updates:
-                    await self.storage.update_state(
+                    self.update_state_tracker.update(
                         (
                             utils.get_channel_id(channel_id) if channel_id else 0,
                             pts,
@@ -675,7 +698,7 @@ class Client(Methods):
                 self.dispatcher.updates_queue.put_nowait((update, users, chats))
         elif isinstance(updates, (raw.types.UpdateShortMessage, raw.types.UpdateShortChatMessage)):
             if not self.skip_updates:
-                await self.storage.update_state(
+                self.update_state_tracker.update(
                     (
                         0,
                         updates.pts,
@@ -712,6 +735,9 @@ class Client(Methods):
             log.info(updates)
 
     async def recover_gaps(self) -> tuple[int, int]:
+        # Make sure the states not written yet are recovered as well
+        await self.update_state_tracker.flush()
+
         states = await self.storage.update_state()
 
         message_updates_counter = 0
@@ -21,7 +21,7 @@ import logging
 from typing import Optional
 
 from .transport import *
-from ..session.internals import DataCenter
+from ..session.internals import DataCenter, DataCenterManager
 
 log = logging.getLogger(__name__)
 
@@ -29,6 +29,9 @@ log = logging.getLogger(__name__)
 class Connection:
     MAX_RETRIES = 3
 
+    # Head start given to each address before the next one is tried too
+    STAGGER = 0.25
+
     MODES = {
         0: TCPFull,
         1: TCPAbridged,
@@ -37,43 +40,110 @@ class Connection:
         4: TCPIntermediateO
     }
 
-    def __init__(self, dc_id: int, test_mode: bool, ipv6: bool, proxy: dict, media: bool = False, mode: int = 3):
+    def __init__(
+        self,
+        dc_id: int,
+        test_mode: bool,
+        ipv6: bool,
+        proxy: dict,
+        media: bool = False,
+        mode: int = 3,
+        dc_manager: DataCenterManager = None,
+        cdn: bool = False
+    ):
         self.dc_id = dc_id
         self.test_mode = test_mode
         self.ipv6 = ipv6
         self.proxy = proxy
         self.media = media
-        self.address = DataCenter(dc_id, test_mode, ipv6, media)
+        self.dc_manager = dc_manager
         self.mode = self.MODES.get(mode, TCPAbridged)
 
+        if dc_manager is not None:
+            self.addresses = dc_manager.get_addresses(dc_id, test_mode, ipv6, media, cdn)
+        else:
+            self.addresses = [DataCenter(dc_id, test_mode, ipv6, media)]
+
+        self.address = self.addresses[0] if self.addresses else None
         self.protocol = None  # type: TCP
 
+    async def race(self, addresses: list[tuple[str, int]]) -> tuple[TCP, tuple[str, int]]:
+        attempts = {}
+        winner = None
+        error = None
+        addresses = iter(addresses)
+
+        try:
+            while True:
+                address = next(addresses, None)
+
+                if address is not None:
+                    protocol = self.mode(":" in address[0], self.proxy)
+                    attempts[asyncio.ensure_future(protocol.connect(address))] = (protocol, address)
+
+                pending = [task for task in attempts if not task.done()]
+
+                if not pending:
+                    break
+
+                # Wait for the current attempts up to the stagger delay, or for as long as needed once every
+                # address has been tried. An attempt failing early lets the next one start right away.
+                done, _ = await asyncio.wait(
+                    pending,
+                    timeout=self.STAGGER if address is not None else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    if task.exception() is None:
+                        winner = attempts[task]
+                        return winner
+
+                    error = task.exception()
+        finally:
+            for task, attempt in attempts.items():
+                if attempt is winner:
+                    continue
+
+                if task.done():
+                    if not task.cancelled():
+                        task.exception()
+                else:
+                    task.cancel()
+
+                attempt[0].close()
+
+        raise error or OSError(f"No known address for DC{self.dc_id}")
+
     async def connect(self):
         for i in range(Connection.MAX_RETRIES):
-            self.protocol = self.mode(self.ipv6, self.proxy)
-
             try:
                 log.info("Connecting...")
-                await self.protocol.connect(self.address)
+                self.protocol, self.address = await self.race(self.addresses)
             except OSError as e:
                 log.warning(f"Unable to connect due to network issues: {e}")
-                self.protocol.close()
                 await asyncio.sleep(1)
             else:
                 log.info("Connected! {} DC{}{} - IPv{} - {}".format(
                     "Test" if self.test_mode else "Production",
                     self.dc_id,
                     " (media)" if self.media else "",
-                    "6" if self.ipv6 else "4",
+                    "6" if ":" in self.address[0] else "4",
                     self.mode.__name__,
                 ))
+
+                if self.dc_manager is not None:
+                    self.dc_manager.report(self.dc_id, self.test_mode, self.media, self.address)
+
                 break
         else:
             log.warning("Connection failed! Trying again...")
             raise TimeoutError
 
     def close(self):
-        self.protocol.close()
+        if self.protocol is not None:
+            self.protocol.close()
+
         log.info("Disconnected")
 
     async def send(self, data: bytes):
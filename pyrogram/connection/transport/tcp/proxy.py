@@ -0,0 +1,165 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import base64
+import ipaddress
+import logging
+from struct import pack, unpack
+
+from .tcp_protocol import TCPProtocol
+
+log = logging.getLogger(__name__)
+
+SOCKS5_ERRORS = {
+    1: "General SOCKS server failure",
+    2: "Connection not allowed by ruleset",
+    3: "Network unreachable",
+    4: "Host unreachable",
+    5: "Connection refused",
+    6: "TTL expired",
+    7: "Command not supported",
+    8: "Address type not supported"
+}
+
+
+async def read(protocol: TCPProtocol, length: int) -> bytes:
+    data = await protocol.read(length)
+
+    if data is None:
+        raise ConnectionError("Proxy closed the connection")
+
+    return data
+
+
+async def socks4_handshake(protocol: TCPProtocol, address: tuple, username: str = None, password: str = None):
+    host, port = address
+
+    try:
+        ip_address = ipaddress.IPv4Address(host)
+    except ValueError:
+        # SOCKS4a: let the proxy resolve the hostname
+        ip_address, hostname = ipaddress.IPv4Address("0.0.0.1"), host.encode() + b"\x00"
+    else:
+        hostname = b""
+
+    await protocol.write(
+        pack(">BBH", 4, 1, port),
+        ip_address.packed,
+        (username or "").encode() + b"\x00",
+        hostname
+    )
+
+    version, status = unpack(">BB", (await read(protocol, 8))[:2])
+
+    if version != 0:
+        raise ConnectionError("Proxy sent an invalid SOCKS4 response")
+
+    if status != 0x5A:
+        raise ConnectionError(f"SOCKS4 proxy refused the connection (status {status:#x})")
+
+
+async def socks5_handshake(protocol: TCPProtocol, address: tuple, username: str = None, password: str = None):
+    host, port = address
+    methods = b"\x00\x02" if username else b"\x00"
+
+    await protocol.write(pack(">BB", 5, len(methods)), methods)
+
+    version, method = unpack(">BB", await read(protocol, 2))
+
+    if version != 5:
+        raise ConnectionError("Proxy sent an invalid SOCKS5 response")
+
+    if method == 2:
+        username, password = username.encode(), (password or "").encode()
+
+        await protocol.write(
+            pack(">BB", 1, len(username)), username,
+            pack(">B", len(password)), password
+        )
+
+        if (await read(protocol, 2))[1] != 0:
+            raise ConnectionError("SOCKS5 proxy authentication failed")
+    elif method != 0:
+        raise ConnectionError("SOCKS5 proxy requires an unsupported authentication method")
+
+    try:
+        ip_address = ipaddress.ip_address(host)
+    except ValueError:
+        destination = pack(">BB", 3, len(host.encode())) + host.encode()
+    else:
+        destination = pack(">B", 4 if ip_address.version == 6 else 1) + ip_address.packed
+
+    await protocol.write(pack(">BBB", 5, 1, 0), destination, pack(">H", port))
+
+    version, status, _, address_type = unpack(">BBBB", await read(protocol, 4))
+
+    if version != 5:
+        raise ConnectionError("Proxy sent an invalid SOCKS5 response")
+
+    if status != 0:
+        raise ConnectionError(SOCKS5_ERRORS.get(status, f"SOCKS5 proxy error {status:#x}"))
+
+    # Skip the address the proxy bound to
+    if address_type == 1:
+        await read(protocol, 4 + 2)
+    elif address_type == 4:
+        await read(protocol, 16 + 2)
+    elif address_type == 3:
+        await read(protocol, (await read(protocol, 1))[0] + 2)
+    else:
+        raise ConnectionError("Proxy sent an invalid SOCKS5 response")
+
+
+async def http_handshake(protocol: TCPProtocol, address: tuple, username: str = None, password: str = None):
+    host, port = address
+
+    try:
+        ip_address = ipaddress.ip_address(host)
+    except ValueError:
+        authority = f"{host}:{port}"
+    else:
+        authority = f"[{host}]:{port}" if ip_address.version == 6 else f"{host}:{port}"
+
+    request = f"CONNECT {authority} HTTP/1.1\r\nHost: {authority}\r\n"
+
+    if username:
+        credentials = base64.b64encode(f"{username}:{password or ''}".encode()).decode()
+        request += f"Proxy-Authorization: Basic {credentials}\r\n"
+
+    await protocol.write(f"{request}\r\n".encode())
+
+    response = await protocol.read_until(b"\r\n\r\n")
+
+    if response is None:
+        raise ConnectionError("Proxy closed the connection")
+
+    status_line = response.split(b"\r\n", 1)[0].decode(errors="replace")
+    parts = status_line.split(" ", 2)
+
+    if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+        raise ConnectionError("Proxy sent an invalid HTTP response")
+
+    if parts[1] != "200":
+        raise ConnectionError(f"HTTP proxy refused the connection: {status_line}")
+
+
+HANDSHAKES = {
+    "socks4": socks4_handshake,
+    "socks5": socks5_handshake,
+    "http": http_handshake
+}
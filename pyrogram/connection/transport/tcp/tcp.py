@@ -17,21 +17,12 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import ipaddress
 import logging
 import socket
-import time
-from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-try:
-    import socks
-except ImportError as e:
-    e.msg = (
-        "PySocks is missing and Pyrogram can't run without. "
-        "Please install it using \"pip3 install pysocks\"."
-    )
-
-    raise e
+from .proxy import HANDSHAKES
+from .tcp_protocol import TCPProtocol
 
 log = logging.getLogger(__name__)
 
@@ -40,86 +31,55 @@ class TCP:
     TIMEOUT = 10
 
     def __init__(self, ipv6: bool, proxy: dict):
-        self.socket = None
-
-        self.reader = None  # type: asyncio.StreamReader
-        self.writer = None  # type: asyncio.StreamWriter
+        self.ipv6 = ipv6
+        self.proxy = proxy
 
-        self.lock = asyncio.Lock()
+        self.protocol = TCPProtocol(TCP.TIMEOUT)
         self.loop = asyncio.get_event_loop()
 
         if proxy:
-            hostname = proxy.get("hostname")
-
-            try:
-                ip_address = ipaddress.ip_address(hostname)
-            except ValueError:
-                self.socket = socks.socksocket(socket.AF_INET)
-            else:
-                if isinstance(ip_address, ipaddress.IPv6Address):
-                    self.socket = socks.socksocket(socket.AF_INET6)
-                else:
-                    self.socket = socks.socksocket(socket.AF_INET)
-
-            self.socket.set_proxy(
-                proxy_type=getattr(socks, proxy.get("scheme").upper()),
-                addr=hostname,
-                port=proxy.get("port", None),
-                username=proxy.get("username", None),
-                password=proxy.get("password", None)
-            )
+            scheme = proxy.get("scheme", "").lower()
 
-            log.info(f"Using proxy {hostname}")
-        else:
-            self.socket = socks.socksocket(
-                socket.AF_INET6 if ipv6
-                else socket.AF_INET
-            )
+            if scheme not in HANDSHAKES:
+                raise ValueError(f"Unsupported proxy scheme: {scheme}")
 
-        self.socket.settimeout(TCP.TIMEOUT)
+            log.info(f"Using proxy {proxy.get('hostname')}")
 
     async def connect(self, address: tuple):
-        # The socket used by the whole logic is blocking and thus it blocks when connecting.
-        # Offload the task to a thread executor to avoid blocking the main event loop.
-        with ThreadPoolExecutor(1) as executor:
-            await self.loop.run_in_executor(executor, self.socket.connect, address)
+        try:
+            await asyncio.wait_for(self._connect(address), TCP.TIMEOUT)
+        except asyncio.TimeoutError:
+            raise OSError("Connection timed out")
+        except OSError:
+            self.close()
+            raise
+
+    async def _connect(self, address: tuple):
+        if self.proxy:
+            await self.loop.create_connection(
+                lambda: self.protocol,
+                self.proxy.get("hostname"),
+                self.proxy.get("port")
+            )
 
-        self.reader, self.writer = await asyncio.open_connection(sock=self.socket)
+            await HANDSHAKES[self.proxy.get("scheme").lower()](
+                self.protocol,
+                address,
+                self.proxy.get("username"),
+                self.proxy.get("password")
+            )
+        else:
+            await self.loop.create_connection(
+                lambda: self.protocol,
+                *address,
+                family=socket.AF_INET6 if self.ipv6 else socket.AF_INET
+            )
 
     def close(self):
-        try:
-            self.writer.close()
-        except AttributeError:
-            try:
-                self.socket.shutdown(socket.SHUT_RDWR)
-            except OSError:
-                pass
-            finally:
-                # A tiny sleep placed here helps avoiding .recv(n) hanging until the timeout.
-                # This is a workaround that seems to fix the occasional delayed stop of a client.
-                time.sleep(0.001)
-                self.socket.close()
-
-    async def send(self, data: bytes):
-        async with self.lock:
-            self.writer.write(data)
-            await self.writer.drain()
-
-    async def recv(self, length: int = 0):
-        data = b""
-
-        while len(data) < length:
-            try:
-                chunk = await asyncio.wait_for(
-                    self.reader.read(length - len(data)),
-                    TCP.TIMEOUT
-                )
-            except (OSError, asyncio.TimeoutError):
-                return None
-            else:
-                if chunk:
-                    data += chunk
-                else:
-                    return None
-
-        return data
+        self.protocol.close()
+
+    async def send(self, *data: bytes):
+        await self.protocol.write(*data)
+
+    async def recv(self, length: int = 0) -> Optional[bytes]:
+        return await self.protocol.read(length)
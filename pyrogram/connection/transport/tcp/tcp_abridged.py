@@ -36,10 +36,10 @@ class TCPAbridged(TCP):
         length = len(data) // 4
 
         await super().send(
-            (bytes([length])
-             if length <= 126
-             else b"\x7f" + length.to_bytes(3, "little"))
-            + data
+            bytes([length])
+            if length <= 126
+            else b"\x7f" + length.to_bytes(3, "little"),
+            data
         )
 
     async def recv(self, length: int = 0) -> Optional[bytes]:
@@ -36,6 +36,9 @@ class TCPAbridgedO(TCP):
         self.encrypt = None
         self.decrypt = None
 
+        # The obfuscation keeps a CTR state, use the same worker for every packet to preserve their order
+        self.crypto_executor = pyrogram.crypto_executor.get_executor()
+
     async def connect(self, address: tuple):
         await super().connect(address)
 
@@ -58,7 +61,7 @@ class TCPAbridgedO(TCP):
     async def send(self, data: bytes, *args):
         length = len(data) // 4
         data = (bytes([length]) if length <= 126 else b"\x7f" + length.to_bytes(3, "little")) + data
-        payload = await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt)
+        payload = await self.loop.run_in_executor(self.crypto_executor, aes.ctr256_encrypt, data, *self.encrypt)
 
         await super().send(payload)
 
@@ -83,4 +86,4 @@ class TCPAbridgedO(TCP):
         if data is None:
             return None
 
-        return await self.loop.run_in_executor(pyrogram.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt)
+        return await self.loop.run_in_executor(self.crypto_executor, aes.ctr256_decrypt, data, *self.decrypt)
@@ -37,11 +37,10 @@ class TCPFull(TCP):
         self.seq_no = 0
 
     async def send(self, data: bytes, *args):
-        data = pack("<II", len(data) + 12, self.seq_no) + data
-        data += pack("<I", crc32(data))
+        header = pack("<II", len(data) + 12, self.seq_no)
         self.seq_no += 1
 
-        await super().send(data)
+        await super().send(header, data, pack("<I", crc32(data, crc32(header))))
 
     async def recv(self, length: int = 0) -> Optional[bytes]:
         length = await super().recv(4)
@@ -54,11 +53,8 @@ class TCPFull(TCP):
         if packet is None:
             return None
 
-        packet = length + packet
-        checksum = packet[-4:]
-        packet = packet[:-4]
-
-        if crc32(packet) != unpack("<I", checksum)[0]:
+        # The checksum covers the length too, which is fed to crc32 first instead of being joined to the packet
+        if crc32(memoryview(packet)[:-4], crc32(length)) != unpack("<I", packet[-4:])[0]:
             return None
 
-        return packet[8:]
+        return packet[4:-4]
@@ -0,0 +1,193 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+log = logging.getLogger(__name__)
+
+
+class TCPProtocol(asyncio.BufferedProtocol):
+    """Receiving end of a TCP connection.
+
+    Incoming bytes are written by the event loop straight into a reusable buffer, out of which readers take whole
+    chunks of the length they ask for. A single timer per connection takes care of the idle timeout.
+
+    Parameters:
+        timeout (``float``):
+            Seconds a read can go without receiving any data before giving up.
+    """
+    BUFFER_SIZE = 256 * 1024
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self.loop = asyncio.get_event_loop()
+
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+
+        self.transport = None  # type: asyncio.Transport
+        self.closed = False
+
+        self.wanted = 0
+        self.waiter = None  # type: asyncio.Future
+        self.drain_waiter = None  # type: asyncio.Future
+
+        self.last_activity = 0.0
+        self.timer = None  # type: asyncio.TimerHandle
+
+    def connection_made(self, transport: asyncio.Transport):
+        self.transport = transport
+        self.last_activity = time.monotonic()
+        self.timer = self.loop.call_later(self.timeout, self.check_timeout)
+
+    def connection_lost(self, exc: Optional[Exception]):
+        self.closed = True
+
+        if self.timer is not None:
+            self.timer.cancel()
+
+        self.wake(self.waiter)
+        self.wake(self.drain_waiter)
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        if self.start == self.end:
+            self.start = self.end = 0
+
+        needed = max(sizehint, self.wanted - (self.end - self.start), 1)
+
+        if len(self.buffer) - self.end < needed:
+            pending = self.end - self.start
+
+            # Grow only when moving the unread bytes to the front is not enough
+            if len(self.buffer) - pending < needed:
+                buffer = bytearray(max(len(self.buffer) * 2, pending + needed))
+                buffer[:pending] = self.view[self.start:self.end]
+
+                self.buffer = buffer
+                self.view = memoryview(buffer)
+            else:
+                self.buffer[:pending] = bytes(self.view[self.start:self.end])
+
+            self.start, self.end = 0, pending
+
+        return self.view[self.end:]
+
+    def buffer_updated(self, nbytes: int):
+        self.end += nbytes
+        self.last_activity = time.monotonic()
+
+        if self.end - self.start >= self.wanted:
+            self.wake(self.waiter)
+
+    def eof_received(self):
+        return False
+
+    def pause_writing(self):
+        if self.drain_waiter is None:
+            self.drain_waiter = self.loop.create_future()
+
+    def resume_writing(self):
+        self.wake(self.drain_waiter)
+        self.drain_waiter = None
+
+    def check_timeout(self):
+        remaining = self.last_activity + self.timeout - time.monotonic()
+
+        if remaining > 0:
+            self.timer = self.loop.call_later(remaining, self.check_timeout)
+        else:
+            self.timer = self.loop.call_later(self.timeout, self.check_timeout)
+            self.wake(self.waiter)
+
+    @staticmethod
+    def wake(waiter: Optional[asyncio.Future]):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def wait(self, length: int) -> bool:
+        self.wanted = length
+        self.last_activity = time.monotonic()
+
+        try:
+            while self.end - self.start < length:
+                if self.closed:
+                    return False
+
+                self.waiter = self.loop.create_future()
+
+                try:
+                    await self.waiter
+                finally:
+                    self.waiter = None
+
+                if time.monotonic() - self.last_activity >= self.timeout:
+                    return False
+        finally:
+            self.wanted = 0
+
+        return True
+
+    async def read(self, length: int) -> Optional[bytes]:
+        if self.end - self.start < length and not await self.wait(length):
+            return None
+
+        data = bytes(self.view[self.start:self.start + length])
+        self.start += length
+
+        return data
+
+    async def read_until(self, separator: bytes, limit: int = 64 * 1024) -> Optional[bytes]:
+        # Bytes already searched, relative to the read position, which can move when the buffer is compacted
+        scanned = 0
+
+        while True:
+            index = self.buffer.find(separator, self.start + scanned, self.end)
+
+            if index != -1:
+                return await self.read(index + len(separator) - self.start)
+
+            pending = self.end - self.start
+
+            if pending >= limit:
+                return None
+
+            scanned = max(0, pending - len(separator) + 1)
+
+            if not await self.wait(pending + 1):
+                return None
+
+    async def write(self, *data: bytes):
+        if self.closed:
+            raise ConnectionResetError("Connection lost")
+
+        self.transport.writelines(data)
+
+        if self.drain_waiter is not None:
+            await asyncio.shield(self.drain_waiter)
+
+            if self.closed:
+                raise ConnectionResetError("Connection lost")
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
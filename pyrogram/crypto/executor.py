@@ -0,0 +1,70 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable
+
+
+class CryptoExecutor(Executor):
+    """Pool of single-threaded executors used to run the cryptography off the event loop.
+
+    Every session (and connection) is pinned to one of the workers, so everything it submits still runs in order,
+    while different sessions encrypt and decrypt in parallel. TgCrypto releases the GIL, so this allows several
+    concurrent transfers to make use of more than one core.
+
+    The number of workers can be changed before starting any client, e.g.: ``pyrogram.crypto_executor.workers = 8``.
+
+    Parameters:
+        workers (``int``, *optional*):
+            Number of worker threads.
+            Defaults to the number of CPUs, up to 4.
+    """
+
+    WORKERS = min(4, os.cpu_count() or 1)
+
+    def __init__(self, workers: int = WORKERS):
+        self.workers = workers
+
+        self.executors = []
+        self.counter = 0
+        self.lock = threading.Lock()
+
+    def _get(self, index: int) -> ThreadPoolExecutor:
+        with self.lock:
+            while len(self.executors) <= index:
+                self.executors.append(ThreadPoolExecutor(1, thread_name_prefix="CryptoWorker"))
+
+            return self.executors[index]
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Get the executor of the next worker, in a round-robin fashion."""
+        with self.lock:
+            index = self.counter % max(1, self.workers)
+            self.counter += 1
+
+        return self._get(index)
+
+    def submit(self, fn: Callable, /, *args, **kwargs) -> Future:
+        # Work that isn't bound to any session runs on the first worker
+        return self._get(0).submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait: bool = True, **kwargs):
+        for executor in self.executors:
+            executor.shutdown(wait, **kwargs)
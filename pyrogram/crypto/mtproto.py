@@ -16,7 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from hashlib import sha256
+from hashlib import sha1, sha256
 from io import BytesIO
 from os import urandom
 
@@ -38,33 +38,68 @@ def kdf(auth_key: bytes, msg_key: bytes, outgoing: bool) -> tuple:
     return aes_key, aes_iv
 
 
-def pack(message: Message, salt: int, session_id: bytes, auth_key: bytes, auth_key_id: bytes) -> bytes:
-    data = Long(salt) + session_id + message.write()
-    padding = urandom(-(len(data) + 12) % 16 + 12)
+class CryptoContext:
+    """Per auth key material used to encrypt and decrypt MTProto messages.
 
-    # 88 = 88 + 0 (outgoing message)
-    msg_key_large = sha256(auth_key[88: 88 + 32] + data + padding).digest()
-    msg_key = msg_key_large[8:24]
-    aes_key, aes_iv = kdf(auth_key, msg_key, True)
+    The auth key slices needed by the key derivation and the msg_key computation are taken once here instead of
+    being sliced out of the auth key again for every single message.
+    """
 
-    return auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+    def __init__(self, auth_key: bytes):
+        self.auth_key = auth_key
+        self.auth_key_id = sha1(auth_key).digest()[-8:]
+
+        # https://core.telegram.org/mtproto/description#defining-aes-key-and-initialization-vector
+        # x = 0 for outgoing and x = 8 for incoming messages
+        self.kdf_a = {True: auth_key[0:36], False: auth_key[8:44]}
+        self.kdf_b = {True: auth_key[40:76], False: auth_key[48:84]}
+
+        # 88 + x; the hash objects are copied and then fed with the rest of the data
+        self.msg_key_out = sha256(auth_key[88:88 + 32])
+        self.msg_key_in = sha256(auth_key[96:96 + 32])
+
+    def kdf(self, msg_key: bytes, outgoing: bool) -> tuple:
+        sha256_a = sha256(msg_key + self.kdf_a[outgoing]).digest()
+        sha256_b = sha256(self.kdf_b[outgoing] + msg_key).digest()
+
+        aes_key = sha256_a[:8] + sha256_b[8:24] + sha256_a[24:32]
+        aes_iv = sha256_b[:8] + sha256_a[8:24] + sha256_b[24:32]
+
+        return aes_key, aes_iv
+
+
+def pack(message: bytes, salt: int, session_id: bytes, context: CryptoContext) -> bytes:
+    data = Long(salt) + session_id + message
+    data += urandom(-(len(data) + 12) % 16 + 12)  # Padding
+
+    msg_key_large = context.msg_key_out.copy()
+    msg_key_large.update(data)
+    msg_key = msg_key_large.digest()[8:24]
+    aes_key, aes_iv = context.kdf(msg_key, True)
+
+    return context.auth_key_id + msg_key + aes.ige256_encrypt(data, aes_key, aes_iv)
 
 
 def unpack(
-    b: BytesIO,
+    packet: bytes,
     session_id: bytes,
-    auth_key: bytes,
-    auth_key_id: bytes
+    context: CryptoContext
 ) -> Message:
-    SecurityCheckMismatch.check(b.read(8) == auth_key_id, "b.read(8) == auth_key_id")
+    # Work on a view of the packet so that slicing it doesn't copy the (possibly huge) payload around
+    packet = memoryview(packet)
 
-    msg_key = b.read(16)
-    aes_key, aes_iv = kdf(auth_key, msg_key, False)
-    data = BytesIO(aes.ige256_decrypt(b.read(), aes_key, aes_iv))
-    data.read(8)  # Salt
+    SecurityCheckMismatch.check(packet[:8] == context.auth_key_id, "packet[:8] == auth_key_id")
+
+    msg_key = bytes(packet[8:24])
+    aes_key, aes_iv = context.kdf(msg_key, False)
+    plaintext = aes.ige256_decrypt(packet[24:], aes_key, aes_iv)
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-session-id
-    SecurityCheckMismatch.check(data.read(8) == session_id, "data.read(8) == session_id")
+    # Skip the salt (8)
+    SecurityCheckMismatch.check(plaintext[8:16] == session_id, "plaintext[8:16] == session_id")
+
+    data = BytesIO(plaintext)
+    data.seek(16)
 
     try:
         message = Message.read(data)
@@ -82,17 +117,20 @@ def unpack(
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-sha256-hash-value-of-msg-key
     # 96 = 88 + 8 (incoming message)
+    msg_key_large = context.msg_key_in.copy()
+    msg_key_large.update(plaintext)
+
     SecurityCheckMismatch.check(
-        msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24],
-        "msg_key == sha256(auth_key[96:96 + 32] + data.getvalue()).digest()[8:24]"
+        msg_key == msg_key_large.digest()[8:24],
+        "msg_key == sha256(auth_key[96:96 + 32] + plaintext).digest()[8:24]"
     )
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-message-length
-    data.seek(32)  # Get to the payload, skip salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
-    payload = data.read()
-    padding = payload[message.length:]
-    SecurityCheckMismatch.check(12 <= len(padding) <= 1024, "12 <= len(padding) <= 1024")
-    SecurityCheckMismatch.check(len(payload) % 4 == 0, "len(payload) % 4 == 0")
+    # The payload starts after salt (8) + session_id (8) + msg_id (8) + seq_no (4) + length (4)
+    payload_length = len(plaintext) - 32
+    padding_length = payload_length - message.length
+    SecurityCheckMismatch.check(12 <= padding_length <= 1024, "12 <= padding_length <= 1024")
+    SecurityCheckMismatch.check(payload_length % 4 == 0, "payload_length % 4 == 0")
 
     # https://core.telegram.org/mtproto/security_guidelines#checking-msg-id
     SecurityCheckMismatch.check(message.msg_id % 2 != 0, "message.msg_id % 2 != 0")
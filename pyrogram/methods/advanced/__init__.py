@@ -18,12 +18,14 @@
 
 from .invoke import Invoke
 from .resolve_peer import ResolvePeer
+from .resolve_peers import ResolvePeers
 from .save_file import SaveFile
 
 
 class Advanced(
     Invoke,
     ResolvePeer,
+    ResolvePeers,
     SaveFile
 ):
     pass
@@ -16,13 +16,15 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+import asyncio
 import logging
 import re
+import time
 from typing import Union
 
 import pyrogram
 from pyrogram import raw, utils
-from pyrogram.errors import PeerIdInvalid
+from pyrogram.errors import PeerIdInvalid, UsernameNotOccupied
 
 log = logging.getLogger(__name__)
 
@@ -61,79 +63,132 @@ class ResolvePeer:
             return raw.types.InputPeerSelf()
 
         try:
-            return await self.storage.get_peer_by_id(peer_id)
+            return await self.peer_cache.get_peer_by_id(peer_id)
         except KeyError:
-            if isinstance(peer_id, str):
-                peer_id = re.sub(r"[@+\s]", "", peer_id.lower())
+            pass
 
+        if isinstance(peer_id, str):
+            peer_id = re.sub(r"[@+\s]", "", peer_id.lower())
+
+            try:
+                int(peer_id)
+            except ValueError:
                 try:
-                    int(peer_id)
-                except ValueError:
-                    try:
-                        return await self.storage.get_peer_by_username(peer_id)
-                    except KeyError:
-                        r = await self.invoke(
-                            raw.functions.contacts.ResolveUsername(
-                                username=peer_id
-                            )
-                        )
+                    return await self.peer_cache.get_peer_by_username(peer_id)
+                except KeyError:
+                    pass
+            else:
+                try:
+                    return await self.peer_cache.get_peer_by_phone_number(peer_id)
+                except KeyError:
+                    raise PeerIdInvalid
 
-                        userid = getattr(
-                            r.peer,
-                            "user_id",
-                            None
-                        )
-                        channelid = getattr(
-                            r.peer,
-                            "channel_id",
-                            None
-                        )
+        # Peers the server has just told us about are not asked for again until the failure expires
+        failure = self.resolve_peer_failures.get(peer_id)
 
-                        if userid:
-                            return await self.storage.get_peer_by_id(userid)
-                        if channelid:
-                            return await self.storage.get_peer_by_id(utils.get_channel_id(channelid))
-                        return await self.storage.get_peer_by_username(peer_id)
-                else:
-                    try:
-                        return await self.storage.get_peer_by_phone_number(peer_id)
-                    except KeyError:
-                        raise PeerIdInvalid
-
-            peer_type = utils.get_peer_type(peer_id)
-
-            if peer_type == "user":
-                await self.fetch_peers(
-                    await self.invoke(
-                        raw.functions.users.GetUsers(
-                            id=[
-                                raw.types.InputUser(
-                                    user_id=peer_id,
-                                    access_hash=0
-                                )
-                            ]
-                        )
-                    )
-                )
-            elif peer_type == "chat":
-                await self.invoke(
-                    raw.functions.messages.GetChats(
-                        id=[-peer_id]
-                    )
+        if failure is not None:
+            if time.monotonic() < failure[1]:
+                raise failure[0].with_traceback(None)
+
+            del self.resolve_peer_failures[peer_id]
+
+        # Concurrent lookups of the same peer share a single request
+        task = self.resolve_peer_tasks.get(peer_id)
+
+        if task is None:
+            task = asyncio.ensure_future(self._resolve_peer(peer_id))
+            task.add_done_callback(lambda t: self._resolve_peer_done(peer_id, t))
+            self.resolve_peer_tasks[peer_id] = task
+
+        return await asyncio.shield(task)
+
+    async def _resolve_peer(
+        self: "pyrogram.Client",
+        peer_id: Union[int, str]
+    ) -> Union[raw.base.InputPeer, raw.base.InputUser, raw.base.InputChannel]:
+        if isinstance(peer_id, str):
+            r = await self.invoke(
+                raw.functions.contacts.ResolveUsername(
+                    username=peer_id
                 )
-            else:
+            )
+
+            userid = getattr(
+                r.peer,
+                "user_id",
+                None
+            )
+            channelid = getattr(
+                r.peer,
+                "channel_id",
+                None
+            )
+
+            if userid:
+                return await self.peer_cache.get_peer_by_id(userid)
+            if channelid:
+                return await self.peer_cache.get_peer_by_id(utils.get_channel_id(channelid))
+            return await self.peer_cache.get_peer_by_username(peer_id)
+
+        peer_type = utils.get_peer_type(peer_id)
+
+        if peer_type == "user":
+            await self.fetch_peers(
                 await self.invoke(
-                    raw.functions.channels.GetChannels(
+                    raw.functions.users.GetUsers(
                         id=[
-                            raw.types.InputChannel(
-                                channel_id=utils.get_channel_id(peer_id),
+                            raw.types.InputUser(
+                                user_id=peer_id,
                                 access_hash=0
                             )
                         ]
                     )
                 )
+            )
+        elif peer_type == "chat":
+            await self.invoke(
+                raw.functions.messages.GetChats(
+                    id=[-peer_id]
+                )
+            )
+        else:
+            await self.invoke(
+                raw.functions.channels.GetChannels(
+                    id=[
+                        raw.types.InputChannel(
+                            channel_id=utils.get_channel_id(peer_id),
+                            access_hash=0
+                        )
+                    ]
+                )
+            )
 
-            try:
-                return await self.storage.get_peer_by_id(peer_id)
-            except KeyError:
-                raise PeerIdInvalid
+        try:
+            return await self.peer_cache.get_peer_by_id(peer_id)
+        except KeyError:
+            raise PeerIdInvalid
+
+    def _resolve_peer_done(
+        self: "pyrogram.Client",
+        peer_id: Union[int, str],
+        task: asyncio.Future
+    ):
+        self.resolve_peer_tasks.pop(peer_id, None)
+
+        if task.cancelled():
+            return
+
+        e = task.exception()
+
+        if isinstance(e, (PeerIdInvalid, UsernameNotOccupied)):
+            now = time.monotonic()
+
+            if len(self.resolve_peer_failures) >= self.max_peer_cache_size:
+                for key, (_, expires) in list(self.resolve_peer_failures.items()):
+                    if expires <= now:
+                        del self.resolve_peer_failures[key]
+
+                if len(self.resolve_peer_failures) >= self.max_peer_cache_size:
+                    self.resolve_peer_failures.pop(next(iter(self.resolve_peer_failures)))
+
+            self.resolve_peer_failures[peer_id] = (e, now + self.RESOLVE_PEER_FAILURE_TTL)
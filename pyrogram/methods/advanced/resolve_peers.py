@@ -0,0 +1,181 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+import time
+from typing import Iterable, Union
+
+import pyrogram
+from pyrogram import raw, utils
+from pyrogram.errors import PeerIdInvalid
+
+log = logging.getLogger(__name__)
+
+# Maximum amount of peers asked to the server in a single request
+CHUNK_SIZE = 200
+
+
+class ResolvePeers:
+    async def resolve_peers(
+        self: "pyrogram.Client",
+        peer_ids: Iterable[Union[int, str]]
+    ) -> list[Union[raw.base.InputPeer, raw.base.InputUser, raw.base.InputChannel]]:
+        """Get the InputPeers of many known peer ids at once.
+
+        Peers already known are served from memory or from the storage, while the unknown ones are asked to the
+        server with as few requests as possible, instead of one request per peer.
+
+        .. include:: /_includes/usable-by/users-bots.rst
+
+        Parameters:
+            peer_ids (Iterable of ``int`` | ``str``):
+                The peer ids you want to extract the InputPeers from.
+                Each one can be a direct id (int), a username (str) or a phone number (str).
+
+        Returns:
+            List of ``InputPeer``: On success, the resolved peer ids are returned in the same order they were given.
+
+        Raises:
+            PeerIdInvalid: In case one of the peers can't be resolved.
+
+        Example:
+            .. code-block:: python
+
+                peers = await app.resolve_peers([user_id1, user_id2, "username"])
+        """
+        if not self.is_connected:
+            raise ConnectionError("Client has not been started yet")
+
+        peer_ids = list(peer_ids)
+        peers = {}
+        usernames = []
+        unknown = []
+
+        for peer_id in dict.fromkeys(peer_ids):
+            if isinstance(peer_id, str):
+                usernames.append(peer_id)
+                continue
+
+            try:
+                peers[peer_id] = await self.peer_cache.get_peer_by_id(peer_id)
+                continue
+            except KeyError:
+                pass
+
+            # The ids resolve_peer or a previous call failed to resolve are not asked for again until the failure expires
+            failure = self.resolve_peer_failures.get(peer_id)
+
+            if failure is not None:
+                if time.monotonic() < failure[1]:
+                    raise failure[0].with_traceback(None)
+
+                del self.resolve_peer_failures[peer_id]
+
+            unknown.append(peer_id)
+
+        # Lookups already in progress (by resolve_peer or by concurrent calls) are shared, the others are registered
+        # for the requests below to complete them
+        tasks = {}
+        missing = {}
+
+        for peer_id in unknown:
+            task = self.resolve_peer_tasks.get(peer_id)
+
+            if task is None:
+                task = self.loop.create_future()
+                task.add_done_callback(lambda t, peer_id=peer_id: self._resolve_peer_done(peer_id, t))
+                self.resolve_peer_tasks[peer_id] = missing[peer_id] = task
+
+            tasks[peer_id] = task
+
+        if missing:
+            # Run apart from the caller, so that the lookups shared with others complete even if it's cancelled
+            await asyncio.shield(asyncio.ensure_future(self._resolve_peers(missing)))
+
+        # Usernames and phone numbers can only be resolved one at a time
+        if usernames:
+            resolved = await asyncio.gather(*[self.resolve_peer(i) for i in usernames])
+            peers.update(zip(usernames, resolved))
+
+        for peer_id, task in tasks.items():
+            peers[peer_id] = await asyncio.shield(task)
+
+        return [peers[i] for i in peer_ids]
+
+    async def _resolve_peers(
+        self: "pyrogram.Client",
+        tasks: dict[int, asyncio.Future]
+    ):
+        missing = {"user": [], "chat": [], "channel": []}
+
+        for peer_id in tasks:
+            missing[utils.get_peer_type(peer_id)].append(peer_id)
+
+        try:
+            for i in range(0, len(missing["user"]), CHUNK_SIZE):
+                await self.fetch_peers(
+                    await self.invoke(
+                        raw.functions.users.GetUsers(
+                            id=[
+                                raw.types.InputUser(
+                                    user_id=peer_id,
+                                    access_hash=0
+                                )
+                                for peer_id in missing["user"][i:i + CHUNK_SIZE]
+                            ]
+                        )
+                    )
+                )
+
+            for i in range(0, len(missing["chat"]), CHUNK_SIZE):
+                await self.invoke(
+                    raw.functions.messages.GetChats(
+                        id=[-peer_id for peer_id in missing["chat"][i:i + CHUNK_SIZE]]
+                    )
+                )
+
+            for i in range(0, len(missing["channel"]), CHUNK_SIZE):
+                await self.invoke(
+                    raw.functions.channels.GetChannels(
+                        id=[
+                            raw.types.InputChannel(
+                                channel_id=utils.get_channel_id(peer_id),
+                                access_hash=0
+                            )
+                            for peer_id in missing["channel"][i:i + CHUNK_SIZE]
+                        ]
+                    )
+                )
+        except Exception as e:
+            for task in tasks.values():
+                task.set_exception(e)
+
+            return
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+
+            raise
+
+        # The peers that didn't come back are remembered as invalid, like the ones resolve_peer fails to resolve
+        for peer_id, task in tasks.items():
+            try:
+                task.set_result(await self.peer_cache.get_peer_by_id(peer_id))
+            except KeyError:
+                task.set_exception(PeerIdInvalid())
@@ -17,7 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import pyrogram
-from pyrogram.session import Session
+from pyrogram.session import Session, SessionPool
 
 
 class Connect:
@@ -38,11 +38,19 @@ class Connect:
             raise ConnectionError("Client is already connected")
 
         await self.load_session()
-
-        self.session = Session(
-            self, await self.storage.dc_id(),
-            await self.storage.auth_key(), await self.storage.test_mode()
-        )
+        await self.dc_manager.load()
+
+        if self.connections > 1:
+            self.session = SessionPool(
+                self, await self.storage.dc_id(),
+                await self.storage.auth_key(), await self.storage.test_mode(),
+                self.connections
+            )
+        else:
+            self.session = Session(
+                self, await self.storage.dc_id(),
+                await self.storage.auth_key(), await self.storage.test_mode()
+            )
 
         await self.session.start()
 
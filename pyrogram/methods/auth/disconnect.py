@@ -36,5 +36,7 @@ class Disconnect:
             raise ConnectionError("Can't disconnect an initialized client")
 
         await self.session.stop()
+        # Updates may have been received after the client was terminated
+        await self.update_state_tracker.flush()
         await self.storage.close()
         self.is_connected = False
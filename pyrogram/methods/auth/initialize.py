@@ -48,5 +48,6 @@ class Initialize:
         await self.dispatcher.start()
 
         self.updates_watchdog_task = asyncio.create_task(self.updates_watchdog())
+        self.update_state_tracker.start()
 
         self.is_initialized = True
@@ -47,5 +47,7 @@ class LogOut:
         await self.invoke(raw.functions.auth.LogOut())
         await self.stop()
         await self.storage.delete()
+        self.peer_cache.clear()
+        self.resolve_peer_failures.clear()
 
         return True
@@ -43,6 +43,7 @@ class Terminate:
             await self.invoke(raw.functions.account.FinishTakeoutSession())
             log.info("Takeout session %s finished", self.takeout_id)
 
+        await self.update_state_tracker.stop()
         await self.storage.save()
         await self.dispatcher.stop()
 
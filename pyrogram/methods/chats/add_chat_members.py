@@ -68,15 +68,16 @@ class AddChatMembers:
         if not isinstance(user_ids, list):
             user_ids = [user_ids]
 
+        users = await self.resolve_peers(user_ids)
         r = []
 
         if isinstance(peer, raw.types.InputPeerChat):
-            for user_id in user_ids:
+            for user in users:
                 r.append(
                     await self.invoke(
                         raw.functions.messages.AddChatUser(
                             chat_id=peer.chat_id,
-                            user_id=await self.resolve_peer(user_id),
+                            user_id=user,
                             fwd_limit=forward_limit
                         )
                     )
@@ -86,10 +87,7 @@ class AddChatMembers:
                 await self.invoke(
                     raw.functions.channels.InviteToChannel(
                         channel=peer,
-                        users=[
-                            await self.resolve_peer(user_id)
-                            for user_id in user_ids
-                        ]
+                        users=users
                     )
                 )
             )
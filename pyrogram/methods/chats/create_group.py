@@ -62,7 +62,7 @@ class CreateGroup:
             users = [users]
         r = await self.invoke(
             raw.functions.messages.CreateChat(
-                users=[await self.resolve_peer(u) for u in users] if users else [],
+                users=await self.resolve_peers(users) if users else [],
                 title=title,
                 ttl_period=message_auto_delete_time
             )
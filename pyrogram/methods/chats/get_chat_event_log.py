@@ -87,7 +87,7 @@ class GetChatEventLog:
                     limit=limit,
                     events_filter=filters.write() if filters else None,
                     admins=(
-                        [await self.resolve_peer(i) for i in user_ids]
+                        await self.resolve_peers(user_ids)
                         if user_ids is not None
                         else user_ids
                     )
@@ -54,7 +54,7 @@ class DeleteContacts:
 
         r = await self.invoke(
             raw.functions.contacts.DeleteContacts(
-                id=[await self.resolve_peer(i) for i in user_ids]
+                id=await self.resolve_peers(user_ids)
             )
         )
 
@@ -71,10 +71,7 @@ class InviteGroupCallParticipants:
         r = await self.invoke(
             raw.functions.phone.InviteToGroupCall(
                 call=call,
-                users=[
-                    await self.resolve_peer(i)
-                    for i in user_ids
-                ]
+                users=await self.resolve_peers(user_ids)
             )
         )
 
@@ -16,7 +16,6 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import asyncio
 from typing import Union, Iterable
 
 import pyrogram
@@ -55,7 +54,7 @@ class GetUsers:
 
         is_iterable = not isinstance(user_ids, (int, str))
         user_ids = list(user_ids) if is_iterable else [user_ids]
-        user_ids = await asyncio.gather(*[self.resolve_peer(i) for i in user_ids])
+        user_ids = await self.resolve_peers(user_ids)
 
         r = await self.invoke(
             raw.functions.users.GetUsers(
@@ -135,15 +135,29 @@ class HTML:
             log.info("Unclosed tags: %s", ", ".join(unclosed_tags))
 
         entities = []
+        mentions = [e for e in parser.entities if isinstance(e, raw.types.InputMessageEntityMentionName)]
+        users = {}
+
+        if mentions and self.client is not None:
+            user_ids = [e.user_id for e in mentions]
+
+            try:
+                users = dict(zip(user_ids, await self.client.resolve_peers(user_ids)))
+            except PeerIdInvalid:
+                # Fall back to resolving the mentions one by one, so that only the invalid ones are dropped
+                for user_id in user_ids:
+                    try:
+                        users[user_id] = await self.client.resolve_peer(user_id)
+                    except PeerIdInvalid:
+                        pass
 
         for entity in parser.entities:
-            if isinstance(entity, raw.types.InputMessageEntityMentionName):
-                try:
-                    if self.client is not None:
-                        entity.user_id = await self.client.resolve_peer(entity.user_id)
-                except PeerIdInvalid:
+            if isinstance(entity, raw.types.InputMessageEntityMentionName) and self.client is not None:
+                if entity.user_id not in users:
                     continue
 
+                entity.user_id = users[entity.user_id]
+
             entities.append(entity)
 
         # Remove zero-length entities
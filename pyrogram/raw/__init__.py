@@ -16,11 +16,6 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-from importlib import import_module
-
+# The generated types, functions and base types are imported lazily, on first access.
+# The classes in all.objects are resolved by TLObject.read the first time their constructor is read.
 from . import types, functions, base, core
-from .all import objects
-
-for k, v in objects.items():
-    path, name = v.rsplit(".", 1)
-    objects[k] = getattr(import_module(path), name)
@@ -19,7 +19,7 @@
 from .future_salt import FutureSalt
 from .future_salts import FutureSalts
 from .gzip_packed import GzipPacked
-from .list import List
+from .list import List, LazyList
 from .message import Message
 from .msg_container import MsgContainer
 from .primitives.bool import Bool, BoolFalse, BoolTrue
@@ -43,11 +43,13 @@ class FutureSalt(TLObject):
 
         return FutureSalt(valid_since, valid_until, salt)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
-
+    def write_into(self, b: BytesIO, *args: Any) -> None:
         b.write(Int(self.valid_since))
         b.write(Int(self.valid_until))
         b.write(Long(self.salt))
 
+    def write(self, *args: Any) -> bytes:
+        b = BytesIO()
+        self.write_into(b)
+
         return b.getvalue()
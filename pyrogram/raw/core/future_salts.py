@@ -46,9 +46,7 @@ class FutureSalts(TLObject):
 
         return FutureSalts(req_msg_id, now, salts)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
-
+    def write_into(self, b: BytesIO, *args: Any) -> None:
         b.write(Int(self.ID, False))
 
         b.write(Long(self.req_msg_id))
@@ -58,6 +56,10 @@ class FutureSalts(TLObject):
         b.write(Int(count))
 
         for salt in self.salts:
-            b.write(salt.write())
+            salt.write_into(b)
+
+    def write(self, *args: Any) -> bytes:
+        b = BytesIO()
+        self.write_into(b)
 
         return b.getvalue()
@@ -46,9 +46,11 @@ class GzipPacked(TLObject):
             )
         ))
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+    @staticmethod
+    def skip(data: BytesIO, *args: Any) -> None:
+        Bytes.skip(data)
 
+    def write_into(self, b: BytesIO, *args: Any) -> None:
         b.write(Int(self.ID, False))
 
         b.write(
@@ -59,4 +61,8 @@ class GzipPacked(TLObject):
             )
         )
 
+    def write(self, *args: Any) -> bytes:
+        b = BytesIO()
+        self.write_into(b)
+
         return b.getvalue()
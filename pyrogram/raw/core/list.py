@@ -16,6 +16,8 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from collections.abc import MutableSequence
+from io import BytesIO
 from typing import Any
 
 from .tl_object import TLObject
@@ -24,3 +26,95 @@ from .tl_object import TLObject
 class List(list[Any], TLObject):
     def __repr__(self) -> str:
         return f"pyrogram.raw.core.List([{','.join(TLObject.__repr__(i) for i in self)}])"
+
+
+class LazyList:
+    """A sequence of objects that keeps their serialized bytes and decodes them on first access.
+
+    Used by Vector.read when TLObject.LAZY_DECODE is enabled. It isn't a list subclass: the interpreter reads the storage
+    of lists directly in many places (concatenation, the json encoder, ...), which would see a list not yet decoded as
+    empty. Every operation goes through the decoded List instead.
+    """
+
+    __slots__ = ("data", "length", "t", "items")
+
+    def __init__(self, data: bytes, length: int, t: Any):
+        # Only the bytes of the vector are kept, not the whole packet they were read from
+        self.data = data
+        self.length = length
+        self.t = t
+        self.items = None
+
+    def decode(self) -> List:
+        if self.items is None:
+            b = BytesIO(self.data)
+
+            # Drop the reference to the bytes first, the elements may contain lazy lists of their own
+            self.data = None
+            self.items = List(self.t.read(b) for _ in range(self.length))
+
+        return self.items
+
+    def __len__(self) -> int:
+        return self.length if self.items is None else len(self.items)
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.decode()[index]
+
+    def __setitem__(self, index: Any, value: Any) -> None:
+        self.decode()[index] = value
+
+    def __delitem__(self, index: Any) -> None:
+        del self.decode()[index]
+
+    def __iter__(self):
+        return iter(self.decode())
+
+    def __reversed__(self):
+        return reversed(self.decode())
+
+    def __contains__(self, value: Any) -> bool:
+        return value in self.decode()
+
+    def __eq__(self, other: Any) -> bool:
+        return self.decode() == _unwrap(other)
+
+    def __ne__(self, other: Any) -> bool:
+        return self.decode() != _unwrap(other)
+
+    def __add__(self, other: Any) -> list:
+        return self.decode() + _unwrap(other)
+
+    def __radd__(self, other: Any) -> list:
+        return _unwrap(other) + self.decode()
+
+    def __iadd__(self, other: Any) -> "LazyList":
+        self.decode().extend(other)
+        return self
+
+    def __mul__(self, n: int) -> list:
+        return self.decode() * n
+
+    __rmul__ = __mul__
+
+    def __getattr__(self, name: str) -> Any:
+        if name in LazyList.__slots__:
+            raise AttributeError(name)
+
+        # Everything else a list has (append, sort, copy, index, ...)
+        return getattr(self.decode(), name)
+
+    def __reduce__(self):
+        return List, (list(self.decode()),)
+
+    def __repr__(self) -> str:
+        return repr(self.decode())
+
+    __hash__ = None  # type: ignore
+
+
+MutableSequence.register(LazyList)
+
+
+def _unwrap(value: Any) -> Any:
+    return value.decode() if isinstance(value, LazyList) else value
@@ -22,6 +22,9 @@ from typing import Any
 from .primitives.int import Int, Long
 from .tl_object import TLObject
 
+RPC_RESULT_ID = Int(0xF35C6D01, False)
+VECTOR_ID = Int(0x1CB5C415, False)
+
 
 class Message(TLObject):
     ID = 0x5BB8E511  # hex(crc32(b"message msg_id:long seqno:int bytes:int body:Object = Message"))
@@ -41,16 +44,41 @@ class Message(TLObject):
         msg_id = Long.read(data)
         seq_no = Int.read(data)
         length = Int.read(data)
-        body = data.read(length)
+        start = data.tell()
 
-        return Message(TLObject.read(BytesIO(body)), msg_id, seq_no, length)
+        # Peek at the constructor ids: rpc_result req_msg_id:long result:Object
+        header = data.read(16)
+        data.seek(start)
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
+        if header[:4] == RPC_RESULT_ID and header[12:16] == VECTOR_ID:
+            # Bare vectors guess their element size from the bytes left in the stream,
+            # make sure they are read from a stream which contains this body only.
+            body = TLObject.read(BytesIO(data.read(length)))
+        else:
+            # Read the body in place, without copying it out of the stream first
+            body = TLObject.read(data)
+            data.seek(start + length)
 
+        return Message(body, msg_id, seq_no, length)
+
+    def write_into(self, b: BytesIO, *args: Any) -> None:
         b.write(Long(self.msg_id))
         b.write(Int(self.seq_no))
+
+        # The length is only known once the body has been serialized: reserve its place and fill it afterwards
+        position = b.tell()
+        b.write(Int(0))
+        self.body.write_into(b)
+        end = b.tell()
+
+        self.length = end - position - 4
+
+        b.seek(position)
         b.write(Int(self.length))
-        b.write(self.body.write())
+        b.seek(end)
+
+    def write(self, *args: Any) -> bytes:
+        b = BytesIO()
+        self.write_into(b)
 
         return b.getvalue()
@@ -39,15 +39,17 @@ class MsgContainer(TLObject):
         count = Int.read(data)
         return MsgContainer([Message.read(data) for _ in range(count)])
 
-    def write(self, *args: Any) -> bytes:
-        b = BytesIO()
-
+    def write_into(self, b: BytesIO, *args: Any) -> None:
         b.write(Int(self.ID, False))
 
         count = len(self.messages)
         b.write(Int(count))
 
         for message in self.messages:
-            b.write(message.write())
+            message.write_into(b)
+
+    def write(self, *args: Any) -> bytes:
+        b = BytesIO()
+        self.write_into(b)
 
         return b.getvalue()
@@ -37,6 +37,16 @@ class Bytes(bytes, TLObject):
 
         return x
 
+    @classmethod
+    def skip(cls, data: BytesIO, *args: Any) -> None:
+        length = int.from_bytes(data.read(1), "little")
+
+        if length <= 253:
+            data.seek(length + (-(length + 1) % 4), 1)
+        else:
+            length = int.from_bytes(data.read(3), "little")
+            data.seek(length + (-length % 4), 1)
+
     def __new__(cls, value: bytes) -> bytes:  # type: ignore
         length = len(value)
 
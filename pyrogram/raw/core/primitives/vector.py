@@ -21,7 +21,7 @@ from typing import cast, Union, Any
 
 from .bool import BoolFalse, BoolTrue, Bool
 from .int import Int, Long
-from ..list import List
+from ..list import List, LazyList
 from ..tl_object import TLObject
 
 
@@ -58,15 +58,52 @@ class Vector(bytes, TLObject):
     @classmethod
     def read(cls, data: BytesIO, t: Any = None, *args: Any) -> List:
         count = Int.read(data)
-        left = len(data.read())
+
+        if t is TLObject and TLObject.LAZY_DECODE and count:
+            # Only find where the vector ends; its elements are decoded when the list is first accessed
+            position = data.tell()
+
+            for _ in range(count):
+                TLObject.skip(data)
+
+            # Copy the bytes of the vector only, so that the list doesn't keep the whole packet alive
+            end = data.tell()
+            data.seek(position)
+
+            return LazyList(data.read(end - position), count, t)
+
+        if t:
+            return List(t.read(data) for _ in range(count))
+
+        # The element type is unknown only for bare vectors returned as RpcResult (the generated types always pass it);
+        # guess the size of the elements from the bytes left in the stream, which in this case contains the vector only.
+        position = data.tell()
+        left = data.seek(0, 2) - position
         size = (left / count) if count else 0
-        data.seek(-left, 1)
+        data.seek(position)
 
-        return List(
-            t.read(data) if t
-            else Vector.read_bare(data, size)
-            for _ in range(count)
-        )
+        return List(Vector.read_bare(data, size) for _ in range(count))
+
+    @classmethod
+    def skip(cls, data: BytesIO, t: Any = None, *args: Any) -> None:
+        if not t:
+            cls.read(data)
+            return
+
+        for _ in range(Int.read(data)):
+            t.skip(data)
+
+    @classmethod
+    def write_into(cls, b: BytesIO, value: list, t: Any = None) -> None:  # type: ignore
+        b.write(Int(cls.ID, False))
+        b.write(Int(len(value)))
+
+        if t:
+            for i in value:
+                b.write(t(i))
+        else:
+            for i in value:
+                i.write_into(b)
 
     def __new__(cls, value: list, t: Any = None) -> bytes:  # type: ignore
         return b"".join(
@@ -16,6 +16,7 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
+from importlib import import_module
 from io import BytesIO
 from json import dumps
 from typing import cast, Any, Union
@@ -28,18 +29,54 @@ class TLObject:
 
     QUALNAME = "Base"
 
+    # Opt-in: when enabled, vectors of objects are kept as their serialized bytes and only decoded on first access
+    LAZY_DECODE = False
+
+    @staticmethod
+    def get_type(constructor_id: int) -> Any:
+        t = objects[constructor_id]
+
+        if isinstance(t, str):
+            # Import the class the first time it's needed
+            path, name = t.rsplit(".", 1)
+            t = objects[constructor_id] = getattr(import_module(path), name)
+
+        return t
+
     @classmethod
     def read(cls, b: BytesIO, *args: Any) -> Any:
-        return cast(TLObject, objects[int.from_bytes(b.read(4), "little")]).read(b, *args)
+        t = TLObject.get_type(int.from_bytes(b.read(4), "little"))
+
+        return cast(TLObject, t).read(b, *args)
+
+    @classmethod
+    def skip(cls, b: BytesIO, *args: Any) -> None:
+        if cls is not TLObject:
+            # Types without a dedicated skip() are read and discarded
+            cls.read(b, *args)
+            return
+
+        t = TLObject.get_type(int.from_bytes(b.read(4), "little"))
+
+        cast(TLObject, t).skip(b, *args)
 
     def write(self, *args: Any) -> bytes:
         pass
 
+    def write_into(self, b: BytesIO, *args: Any) -> None:
+        # Serialize into an existing buffer, so that nested objects don't need their own intermediate bytes
+        b.write(self.write(*args))
+
     @staticmethod
     def default(obj: "TLObject") -> Union[str, dict[str, str]]:
         if isinstance(obj, bytes):
             return repr(obj)
 
+        from .list import LazyList
+
+        if isinstance(obj, LazyList):
+            return obj.decode()
+
         return {
             "_": obj.QUALNAME,
             **{
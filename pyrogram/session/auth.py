@@ -47,16 +47,19 @@ class Auth:
         self.test_mode = test_mode
         self.ipv6 = client.ipv6
         self.proxy = client.proxy
+        self.dc_manager = client.dc_manager
 
         self.connection = None
 
     @staticmethod
     def pack(data: TLObject) -> bytes:
+        data = data.write()
+
         return (
             bytes(8)
             + Long(MsgId())
-            + Int(len(data.write()))
-            + data.write()
+            + Int(len(data))
+            + data
         )
 
     @staticmethod
@@ -81,7 +84,10 @@ class Auth:
         # The server may close the connection at any time, causing the auth key creation to fail.
         # If that happens, just try again up to MAX_RETRIES times.
         while True:
-            self.connection = Connection(self.dc_id, self.test_mode, self.ipv6, self.proxy)
+            self.connection = Connection(
+                self.dc_id, self.test_mode, self.ipv6, self.proxy,
+                dc_manager=self.dc_manager
+            )
 
             try:
                 log.info(f"Start creating a new auth key on DC{self.dc_id}")
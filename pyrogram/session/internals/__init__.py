@@ -17,5 +17,7 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .data_center import DataCenter
+from .data_center_manager import DataCenterManager
 from .msg_factory import MsgFactory
 from .msg_id import MsgId
+from .stored_msg_ids import StoredMsgIds
@@ -0,0 +1,122 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import logging
+from itertools import chain, zip_longest
+
+import pyrogram
+from pyrogram import raw
+from .data_center import DataCenter
+
+log = logging.getLogger(__name__)
+
+
+class DataCenterManager:
+    """Addresses of the data centers, as learnt from the server.
+
+    The addresses received with ``help.GetConfig`` are cached in the storage engine, so that they survive restarts,
+    and are tried before the built-in :obj:`DataCenter` table. Test and production addresses are kept apart, and CDN
+    addresses are only used to reach CDN data centers. The address that connected first is remembered and
+    tried first the next time.
+
+    Parameters:
+        storage (:obj:`~pyrogram.storage.Storage`):
+            The storage engine to cache the addresses in.
+    """
+
+    def __init__(self, storage: "pyrogram.storage.Storage"):
+        self.storage = storage
+
+        # (dc_id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode)
+        self.options = []
+        # (dc_id, test_mode, is_media) -> (ip_address, port)
+        self.fastest = {}
+
+    async def load(self):
+        try:
+            self.options = await self.storage.dc_options()
+        except NotImplementedError:
+            pass
+
+    async def update(self, dc_options: list["raw.base.DcOption"], test_mode: bool):
+        # The addresses of the other environment (test or production) are kept as they are
+        options = [i for i in self.options if i[6] != test_mode]
+
+        for option in dc_options:
+            # Obfuscated-only and MTProxy addresses can't be used by every transport
+            if option.tcpo_only or option.secret:
+                continue
+
+            option = (option.id, option.ip_address, option.port, bool(option.ipv6), bool(option.media_only),
+                      bool(option.cdn), test_mode)
+
+            if option not in options:
+                options.append(option)
+
+        if options == self.options:
+            return
+
+        self.options = options
+
+        try:
+            await self.storage.dc_options(options)
+        except NotImplementedError:
+            pass
+
+    def get_addresses(
+        self,
+        dc_id: int,
+        test_mode: bool,
+        ipv6: bool,
+        media: bool = False,
+        cdn: bool = False
+    ) -> list[tuple[str, int]]:
+        """Get the addresses of a DC, in the order they should be tried.
+
+        When IPv6 is enabled, IPv6 and IPv4 addresses alternate, so that a broken IPv6 network doesn't delay the
+        connection for long.
+        """
+        families = []
+
+        for is_ipv6 in ([True, False] if ipv6 else [False]):
+            options = [
+                i for i in self.options
+                if i[0] == dc_id and i[3] == is_ipv6 and i[5] == cdn and i[6] == test_mode
+            ]
+            addresses = [(i[1], i[2]) for i in options if media and i[4]]
+            addresses += [(i[1], i[2]) for i in options if not i[4]]
+
+            # The built-in table also has some CDN data centers, it's only skipped for the ids it doesn't have
+            try:
+                addresses.append(DataCenter(dc_id, test_mode, is_ipv6, media))
+            except KeyError:
+                pass
+
+            families.append(list(dict.fromkeys(addresses)))
+
+        addresses = [i for i in chain.from_iterable(zip_longest(*families)) if i is not None]
+        fastest = self.fastest.get((dc_id, test_mode, media))
+
+        if fastest in addresses:
+            addresses.remove(fastest)
+            addresses.insert(0, fastest)
+
+        return addresses
+
+    def report(self, dc_id: int, test_mode: bool, media: bool, address: tuple[str, int]):
+        self.fastest[(dc_id, test_mode, media)] = address
@@ -30,9 +30,10 @@ class MsgFactory:
         self.seq_no = SeqNo()
 
     def __call__(self, body: TLObject) -> Message:
+        # The length is filled in by Message.write, so that the body is serialized only once
         return Message(
             body,
             MsgId(),
             self.seq_no(not isinstance(body, not_content_related)),
-            len(body)
+            0
         )
@@ -0,0 +1,55 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import heapq
+
+
+class StoredMsgIds:
+    """Sliding window of the most recent server msg_ids, used to discard replayed messages.
+
+    Membership is checked against a set and the lowest stored id is kept on top of a min-heap, so every
+    operation is constant (or logarithmic) time regardless of the window size. Once more than ``max_size``
+    ids are stored, the lowest half is evicted, exactly like a sorted list trimmed from the left would.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+
+        self.ids = set()
+        self.heap = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self.ids
+
+    @property
+    def min(self) -> int:
+        return self.heap[0]
+
+    def add(self, msg_id: int):
+        if msg_id in self.ids:
+            return
+
+        self.ids.add(msg_id)
+        heapq.heappush(self.heap, msg_id)
+
+        if len(self.heap) > self.max_size:
+            for _ in range(self.max_size // 2):
+                self.ids.discard(heapq.heappop(self.heap))
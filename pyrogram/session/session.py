@@ -17,10 +17,10 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import bisect
 import logging
 import os
-from hashlib import sha1
+import random
+import time
 from io import BytesIO
 
 import pyrogram
@@ -34,17 +34,28 @@ from pyrogram.errors import (
     SecurityCheckMismatch,
 )
 from pyrogram.raw.all import layer
-from pyrogram.raw.core import TLObject, MsgContainer, Int, FutureSalts
-from .internals import MsgId, MsgFactory
+from pyrogram.raw.core import TLObject, MsgContainer, Int, Long, FutureSalts
+from .internals import MsgId, MsgFactory, StoredMsgIds
 
 log = logging.getLogger(__name__)
 
 
 class Result:
-    def __init__(self):
+    def __init__(self, data: TLObject = None):
         self.value = None
         self.event = asyncio.Event()
 
+        # The query and the msg_ids it was sent with, so that it can be sent again after a reconnection
+        self.data = data
+        self.msg_ids = []
+
+        # Whether the query was handed to the connection, and whether the server acknowledged receiving it
+        self.sent = False
+        self.acked = False
+
+        # Whether the caller stopped waiting for the result, such a request must not be sent again
+        self.abandoned = False
+
 
 class Session:
     START_TIMEOUT = 1
@@ -55,6 +66,22 @@ class Session:
     PING_INTERVAL = 5
     STORED_MSG_IDS_MAX_SIZE = 1000 * 2
 
+    # Delays between connection attempts and between retries of a request double at every attempt, starting from
+    # BACKOFF_BASE_DELAY up to BACKOFF_MAX_DELAY, and are randomized to avoid many clients retrying at the same time.
+    BACKOFF_BASE_DELAY = 0.5
+    BACKOFF_MAX_DELAY = 30
+
+    # Outgoing messages issued within SEND_QUEUE_DELAY seconds of each other are packed into a single MsgContainer,
+    # up to SEND_QUEUE_MAX_SIZE messages or SEND_QUEUE_MAX_BYTES bytes. A delay of 0 only coalesces the messages
+    # that are sent during the same event loop iteration.
+    SEND_QUEUE_DELAY = 0
+    SEND_QUEUE_MAX_SIZE = 1020  # The server accepts up to 1024 messages per container
+    SEND_QUEUE_MAX_BYTES = 32 * 1024
+
+    # Packets up to this size are encrypted/decrypted right away on the event loop, bigger ones are offloaded to the
+    # crypto executor. Hopping to a thread costs more than the cryptography itself for small packets.
+    CRYPTO_INLINE_MAX_SIZE = 4 * 1024
+
     TRANSPORT_ERRORS = {
         404: "auth key not found",
         429: "transport flood",
@@ -74,7 +101,8 @@ class Session:
         auth_key: bytes,
         test_mode: bool,
         is_media: bool = False,
-        is_cdn: bool = False
+        is_cdn: bool = False,
+        receive_updates: bool = True
     ):
         self.client = client
         self.dc_id = dc_id
@@ -82,10 +110,12 @@ class Session:
         self.test_mode = test_mode
         self.is_media = is_media
         self.is_cdn = is_cdn
+        self.receive_updates = receive_updates
 
         self.connection = None
 
-        self.auth_key_id = sha1(auth_key).digest()[-8:]
+        self.crypto_context = mtproto.CryptoContext(auth_key)
+        self.crypto_executor = pyrogram.crypto_executor.get_executor()
 
         self.session_id = os.urandom(8)
         self.msg_factory = MsgFactory()
@@ -96,7 +126,13 @@ class Session:
 
         self.results = {}
 
-        self.stored_msg_ids = []
+        self.stored_msg_ids = StoredMsgIds(self.STORED_MSG_IDS_MAX_SIZE)
+
+        self.send_queue = asyncio.Queue()
+        self.send_task = None
+
+        # Container msg_id -> msg_ids of the messages packed inside it
+        self.containers = {}
 
         self.ping_task = None
         self.ping_task_event = asyncio.Event()
@@ -104,28 +140,43 @@ class Session:
         self.network_task = None
 
         self.is_connected = asyncio.Event()
+        self.is_reconnecting = False
+
+        self.reconnects = 0
+        self.last_reconnect_duration = None
+        self.total_reconnect_duration = 0.0
 
         self.loop = asyncio.get_event_loop()
 
+    def get_backoff_delay(self, attempt: int) -> float:
+        delay = min(self.BACKOFF_MAX_DELAY, self.BACKOFF_BASE_DELAY * 2 ** attempt)
+
+        return delay / 2 + random.uniform(0, delay / 2)
+
     async def start(self):
+        attempt = 0
+
         while True:
             self.connection = Connection(
                 self.dc_id,
                 self.test_mode,
                 self.client.ipv6,
                 self.client.proxy,
-                self.is_media
+                self.is_media,
+                dc_manager=self.client.dc_manager,
+                cdn=self.is_cdn
             )
 
             try:
                 await self.connection.connect()
 
                 self.network_task = self.loop.create_task(self.network_worker())
+                self.send_task = self.loop.create_task(self.send_worker())
 
                 await self.send(raw.functions.Ping(ping_id=0), timeout=self.START_TIMEOUT)
 
                 if not self.is_cdn:
-                    await self.send(
+                    config = await self.send(
                         raw.functions.InvokeWithLayer(
                             layer=layer,
                             query=raw.functions.InitConnection(
@@ -147,6 +198,8 @@ class Session:
                         timeout=self.START_TIMEOUT
                     )
 
+                    await self.client.dc_manager.update(config.dc_options, self.test_mode)
+
                 self.ping_task = self.loop.create_task(self.ping_worker())
 
                 log.info(f"Session initialized: Layer {layer}")
@@ -157,7 +210,9 @@ class Session:
                 await self.stop()
                 raise e
             except (OSError, TimeoutError, RPCError):
-                await self.stop()
+                await self.disconnect()
+                await asyncio.sleep(self.get_backoff_delay(attempt))
+                attempt += 1
             except Exception as e:
                 await self.stop()
                 raise e
@@ -168,7 +223,8 @@ class Session:
 
         log.info("Session started")
 
-    async def stop(self):
+    async def disconnect(self):
+        # Stop the workers and close the connection, leaving the requests waiting for their results untouched
         self.is_connected.clear()
 
         self.ping_task_event.set()
@@ -178,19 +234,33 @@ class Session:
 
         self.ping_task_event.clear()
 
+        if self.send_task is not None:
+            self.send_queue.put_nowait(None)
+
         self.connection.close()
 
         if self.network_task:
             await self.network_task
 
+        if self.send_task is not None:
+            await self.send_task
+            self.send_task = None
+
+        self.containers.clear()
+
+    async def stop(self):
+        await self.disconnect()
+
+        while not self.send_queue.empty():
+            item = self.send_queue.get_nowait()
+
+            if item is not None and not item[2].done():
+                item[2].set_exception(OSError("Session stopped"))
+
         for i in self.results.values():
             i.event.set()
 
-        if not self.is_media and callable(self.client.disconnect_handler):
-            try:
-                await self.client.disconnect_handler(self.client)
-            except Exception as e:
-                log.error(e, exc_info=True)
+        await self.call_disconnect_handler()
 
         log.info("Session stopped")
 
@@ -198,16 +268,71 @@ class Session:
         await self.stop()
         await self.start()
 
+    async def reconnect(self):
+        log.info("Reconnecting...")
+
+        started = time.monotonic()
+
+        # Messages queued in the meantime wait for the send worker of the new connection
+        self.is_reconnecting = True
+
+        try:
+            await self.disconnect()
+            await self.call_disconnect_handler()
+
+            # Requests the server didn't acknowledge may have been lost with the connection, they are sent again once
+            # reconnected. The others keep waiting, their results are delivered on the new connection.
+            lost = {id(i): i for i in self.results.values() if i.sent and not i.acked}
+
+            await self.start()
+        finally:
+            self.is_reconnecting = False
+
+        # Requests that timed out while reconnecting were already given up on (and possibly retried by the caller)
+        lost = {k: v for k, v in lost.items() if not v.event.is_set() and not v.abandoned}
+
+        for result in lost.values():
+            self.resend(result)
+
+        self.reconnects += 1
+        self.last_reconnect_duration = time.monotonic() - started
+        self.total_reconnect_duration += self.last_reconnect_duration
+
+        log.info(f"Reconnected in {self.last_reconnect_duration:.2f}s, sent {len(lost)} lost requests again")
+
+    def resend(self, result: Result):
+        message = self.msg_factory(result.data)
+
+        result.msg_ids.append(message.msg_id)
+        self.results[message.msg_id] = result
+
+        sent = self.loop.create_future()
+        # Nobody waits for the message to be sent, the result is waited for instead
+        sent.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+        self.send_queue.put_nowait((message, message.write(), sent))
+
+    async def call_disconnect_handler(self):
+        if not self.is_media and self.receive_updates and callable(self.client.disconnect_handler):
+            try:
+                await self.client.disconnect_handler(self.client)
+            except Exception as e:
+                log.error(e, exc_info=True)
+
+    async def run_crypto(self, size: int, func, *args):
+        if size <= self.CRYPTO_INLINE_MAX_SIZE:
+            return func(*args)
+
+        return await self.loop.run_in_executor(self.crypto_executor, func, *args)
+
     async def handle_packet(self, packet):
         try:
-            data = await self.loop.run_in_executor(
-                pyrogram.crypto_executor,
+            data = await self.run_crypto(
+                len(packet),
                 mtproto.unpack,
-                BytesIO(packet),
+                packet,
                 self.session_id,
-                self.auth_key,
-                self.auth_key_id,
-                # self.stored_msg_ids
+                self.crypto_context
             )
         except SecurityCheckMismatch:
             return
@@ -234,11 +359,8 @@ class Session:
                     self.pending_acks.add(msg.msg_id)
 
             try:
-                if len(self.stored_msg_ids) > Session.STORED_MSG_IDS_MAX_SIZE:
-                    del self.stored_msg_ids[:Session.STORED_MSG_IDS_MAX_SIZE // 2]
-
                 if self.stored_msg_ids:
-                    if msg.msg_id < self.stored_msg_ids[0]:
+                    if msg.msg_id < self.stored_msg_ids.min:
                         raise SecurityCheckMismatch("The msg_id is lower than all the stored values")
 
                     if msg.msg_id in self.stored_msg_ids:
@@ -257,7 +379,7 @@ class Session:
                 log.info("Discarding packet: %s", e)
                 return
             else:
-                bisect.insort(self.stored_msg_ids, msg.msg_id)
+                self.stored_msg_ids.add(msg.msg_id)
 
             if isinstance(msg.body, (raw.types.MsgDetailedInfo, raw.types.MsgNewDetailedInfo)):
                 self.pending_acks.add(msg.body.answer_msg_id)
@@ -266,6 +388,14 @@ class Session:
             if isinstance(msg.body, raw.types.NewSessionCreated):
                 continue
 
+            if isinstance(msg.body, raw.types.MsgsAck):
+                for i in msg.body.msg_ids:
+                    for j in self.containers.get(i, [i]):
+                        if j in self.results:
+                            self.results[j].acked = True
+
+                continue
+
             msg_id = None
 
             if isinstance(msg.body, (raw.types.BadMsgNotification, raw.types.BadServerSalt)):
@@ -275,9 +405,16 @@ class Session:
             elif isinstance(msg.body, raw.types.Pong):
                 msg_id = msg.body.msg_id
             else:
-                if self.client is not None:
+                if self.client is not None and self.receive_updates:
                     self.loop.create_task(self.client.handle_updates(msg.body))
 
+            if msg_id in self.containers:
+                # The server refers to the whole container, hand the notification to every message inside it
+                for i in self.containers.pop(msg_id):
+                    if i in self.results:
+                        self.results[i].value = msg.body
+                        self.results[i].event.set()
+
             if msg_id in self.results:
                 self.results[msg_id].value = getattr(msg.body, "result", msg.body)
                 self.results[msg_id].event.set()
@@ -325,7 +462,7 @@ class Session:
                     log.warning(f'Server sent "{Int.read(BytesIO(packet))}"')
 
                 if self.is_connected.is_set():
-                    self.loop.create_task(self.restart())
+                    self.loop.create_task(self.reconnect())
 
                 break
 
@@ -333,51 +470,174 @@ class Session:
 
         log.info("NetworkTask stopped")
 
+    async def send_worker(self):
+        log.info("SendTask started")
+
+        item = None
+        stop = False
+
+        while not stop:
+            if item is None:
+                item = await self.send_queue.get()
+
+                if item is None:
+                    break
+
+                if self.SEND_QUEUE_DELAY > 0:
+                    await asyncio.sleep(self.SEND_QUEUE_DELAY)
+                else:
+                    await asyncio.sleep(0)
+
+            batch = [item]
+            size = len(item[1])
+            item = None
+
+            while not self.send_queue.empty() and len(batch) < self.SEND_QUEUE_MAX_SIZE:
+                next_item = self.send_queue.get_nowait()
+
+                if next_item is None:
+                    stop = True
+                    break
+
+                if size + len(next_item[1]) > self.SEND_QUEUE_MAX_BYTES:
+                    # Doesn't fit, it will start the next batch
+                    item = next_item
+                    break
+
+                batch.append(next_item)
+                size += len(next_item[1])
+
+            batch = [i for i in batch if not i[2].cancelled()]
+
+            if batch:
+                await self._send_batch(batch)
+
+        if item is not None and not item[2].done():
+            item[2].set_exception(OSError("Session stopped"))
+
+        log.info("SendTask stopped")
+
+    async def _send_batch(self, batch: list):
+        messages = [message for message, _, _ in batch]
+        payloads = [payload for _, payload, _ in batch]
+        acks = []
+
+        if self.pending_acks and not isinstance(messages[0].body, raw.types.MsgsAck):
+            acks = list(self.pending_acks)
+            self.pending_acks.clear()
+            messages.append(self.msg_factory(raw.types.MsgsAck(msg_ids=acks)))
+            payloads.append(messages[-1].write())
+
+        if len(messages) == 1:
+            message = messages[0]
+            payload = payloads[0]
+        else:
+            # Build the container out of the already serialized messages instead of serializing them again
+            message = self.msg_factory(MsgContainer(messages))
+            message.length = 8 + sum(len(i) for i in payloads)
+            payload = b"".join([
+                Long(message.msg_id), Int(message.seq_no), Int(message.length),
+                Int(MsgContainer.ID, False), Int(len(messages)),
+                *payloads
+            ])
+
+            self.containers[message.msg_id] = [i.msg_id for i in messages]
+
+            # Drop containers the server could not possibly refer to anymore
+            expired = message.msg_id - int(self.WAIT_TIMEOUT * 2) * 2 ** 32
+
+            for i in [i for i in self.containers if i < expired]:
+                del self.containers[i]
+
+        for i, _, _ in batch:
+            if i.msg_id in self.results:
+                self.results[i.msg_id].sent = True
+
+        try:
+            payload = await self.run_crypto(
+                len(payload),
+                mtproto.pack,
+                payload,
+                self.salt,
+                self.session_id,
+                self.crypto_context
+            )
+
+            await self.connection.send(payload)
+        except Exception as e:
+            self.containers.pop(message.msg_id, None)
+            self.pending_acks.update(acks)
+
+            for i, _, sent in batch:
+                if not sent.done():
+                    # Requests waiting for a result are sent again once the connection is back
+                    if i.msg_id in self.results:
+                        sent.set_result(None)
+                    else:
+                        sent.set_exception(e)
+        else:
+            for _, _, sent in batch:
+                if not sent.done():
+                    sent.set_result(None)
+
     async def send(
         self,
         data: TLObject,
         wait_response: bool = True,
         timeout: float = WAIT_TIMEOUT
     ):
+        # Nothing would ever send the message
+        if self.send_task is None and not self.is_reconnecting:
+            raise OSError("Session not started")
+
         message = self.msg_factory(data)
         msg_id = message.msg_id
+        payload = message.write()
 
         if wait_response:
-            self.results[msg_id] = Result()
+            result = Result(data)
+            result.msg_ids.append(msg_id)
+            self.results[msg_id] = result
 
         # Call log.debug twice because calling it once by appending "data" to the previous string (i.e. f"Kind: {data}")
         # will cause "data" to be evaluated as string every time instead of only when debug is actually enabled.
         log.debug(f"Sent:")
         log.debug(message)
 
-        payload = await self.loop.run_in_executor(
-            pyrogram.crypto_executor,
-            mtproto.pack,
-            message,
-            self.salt,
-            self.session_id,
-            self.auth_key,
-            self.auth_key_id
-        )
+        sent = self.loop.create_future()
+        self.send_queue.put_nowait((message, payload, sent))
 
         try:
-            await self.connection.send(payload)
-        except OSError as e:
+            await asyncio.wait_for(sent, timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            if wait_response:
+                result.abandoned = True
+
             self.results.pop(msg_id, None)
+
+            if isinstance(e, asyncio.TimeoutError):
+                raise TimeoutError from None
+
             raise e
 
         if wait_response:
             try:
-                await asyncio.wait_for(self.results[msg_id].event.wait(), timeout)
+                await asyncio.wait_for(result.event.wait(), timeout)
             except asyncio.TimeoutError:
                 pass
             finally:
-                result = self.results.pop(msg_id).value
+                result.abandoned = True
+
+                # The request may have been sent again with other msg_ids after a reconnection
+                for i in result.msg_ids:
+                    self.results.pop(i, None)
+
+            result = result.value
 
             if result is None:
                 raise TimeoutError
             elif isinstance(result, raw.types.RpcError):
-                if isinstance(data, Session.CUR_ALWD_INNR_QRYS):
+                while isinstance(data, Session.CUR_ALWD_INNR_QRYS):
                     data = data.query
 
                 RPCError.raise_it(result, type(data))
@@ -398,19 +658,24 @@ class Session:
     ):
         sleep_threshold = max(sleep_threshold, self.client.sleep_threshold)
 
-        try:
-            await asyncio.wait_for(self.is_connected.wait(), self.WAIT_TIMEOUT)
-        except asyncio.TimeoutError:
-            pass
+        if not self.receive_updates and not isinstance(query, raw.functions.InvokeWithoutUpdates):
+            query = raw.functions.InvokeWithoutUpdates(query=query)
 
-        if isinstance(query, Session.CUR_ALWD_INNR_QRYS):
-            inner_query = query.query
-        else:
-            inner_query = query
+        inner_query = query
+
+        while isinstance(inner_query, Session.CUR_ALWD_INNR_QRYS):
+            inner_query = inner_query.query
 
         query_name = ".".join(inner_query.QUALNAME.split(".")[1:])
 
+        attempt = 0
+
         while True:
+            try:
+                await asyncio.wait_for(self.is_connected.wait(), self.WAIT_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
+
             try:
                 return await self.send(query, timeout=timeout)
             except (FloodWait, FloodPremiumWait) as e:
@@ -440,7 +705,7 @@ class Session:
                 (log.warning if retries < 2 else log.info)(
                     f'[{Session.MAX_RETRIES - retries + 1}] Retrying "{query_name}" due to {str(e) or repr(e)}')
 
-                await asyncio.sleep(0.5)
+                await asyncio.sleep(self.get_backoff_delay(attempt))
 
-                return await self.invoke(query, retries - 1, timeout)
-        raise TimeoutError("Exceeded maximum number of retries")
+                attempt += 1
+                retries -= 1
@@ -0,0 +1,122 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+
+import pyrogram
+from pyrogram.raw.core import TLObject
+from .session import Session
+
+log = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """Several sessions connected to the same DC, sharing the same authorization key.
+
+    Each session runs on its own connection with its own session id, so that a slow response on one of them doesn't
+    hold back the requests sent on the others. Requests go to the connected session with the least requests in
+    flight. Only the first session receives updates, the others invoke their queries without updates.
+
+    Parameters:
+        client (:obj:`~pyrogram.Client`):
+            The client the sessions belong to.
+
+        dc_id (``int``):
+            The DC the sessions connect to.
+
+        auth_key (``bytes``):
+            The authorization key shared by the sessions.
+
+        test_mode (``bool``):
+            Whether the sessions connect to the test servers.
+
+        size (``int``):
+            The amount of sessions to keep.
+    """
+
+    def __init__(
+        self,
+        client: "pyrogram.Client",
+        dc_id: int,
+        auth_key: bytes,
+        test_mode: bool,
+        size: int
+    ):
+        self.client = client
+        self.dc_id = dc_id
+        self.auth_key = auth_key
+        self.test_mode = test_mode
+
+        self.sessions = [
+            Session(client, dc_id, auth_key, test_mode, receive_updates=i == 0)
+            for i in range(max(size, 1))
+        ]
+        self.in_flight = [0] * len(self.sessions)
+
+    @property
+    def is_connected(self) -> asyncio.Event:
+        return self.sessions[0].is_connected
+
+    @property
+    def reconnects(self) -> int:
+        return sum(session.reconnects for session in self.sessions)
+
+    @property
+    def total_reconnect_duration(self) -> float:
+        return sum(session.total_reconnect_duration for session in self.sessions)
+
+    async def start(self):
+        # The first session must be up before the others, it is the one that reports authorization errors
+        await self.sessions[0].start()
+
+        try:
+            await asyncio.gather(*[session.start() for session in self.sessions[1:]])
+        except Exception:
+            await self.stop()
+            raise
+
+        log.info(f"Session pool started with {len(self.sessions)} connections")
+
+    async def stop(self):
+        await asyncio.gather(*[session.stop() for session in self.sessions])
+
+    async def restart(self):
+        await self.stop()
+        await self.start()
+
+    def get_session(self) -> int:
+        return min(
+            range(len(self.sessions)),
+            key=lambda i: (not self.sessions[i].is_connected.is_set(), self.in_flight[i], i)
+        )
+
+    async def invoke(
+        self,
+        query: TLObject,
+        retries: int = Session.MAX_RETRIES,
+        timeout: float = Session.WAIT_TIMEOUT,
+        sleep_threshold: float = Session.SLEEP_THRESHOLD
+    ):
+        i = self.get_session()
+        self.in_flight[i] += 1
+
+        try:
+            return await self.sessions[i].invoke(query, retries, timeout, sleep_threshold)
+        finally:
+            self.in_flight[i] -= 1
@@ -22,5 +22,9 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 from .file_storage import FileStorage
+from .log_storage import LogStorage
 from .memory_storage import MemoryStorage
+from .peer_cache import PeerCache
+from .shared_storage import SharedDatabase, SharedStorage
 from .storage import Storage
+from .update_state_tracker import UpdateStateTracker
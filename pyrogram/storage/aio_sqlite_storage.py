@@ -16,7 +16,6 @@
 #  You should have received a copy of the GNU Lesser General Public License
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
-import inspect
 import aiosqlite  # aiosqlite==0.20.0
 import os
 import time
@@ -114,6 +113,7 @@ class AioSQLiteStorage(Storage):
         super().__init__(name)
 
         self.conn = None  # type: aiosqlite.Connection
+        self.session = None  # type: dict[str, Any]
 
     async def update(self):
         version = await self.version()
@@ -268,16 +268,21 @@ class AioSQLiteStorage(Storage):
 
         return get_input_peer(*r)
 
-    async def _get(self):
-        attr = inspect.stack()[2].function
+    async def _get(self, attr: str):
+        # The sessions row is read once and then served from memory
+        if self.session is None:
+            q = await self.conn.execute(
+                "SELECT * FROM sessions"
+            )
+            row = await q.fetchone()
 
-        r = await self.conn.execute(
-            f"SELECT {attr} FROM sessions"
-        )
-        return (await r.fetchone())[0]
+            self.session = {column[0]: value for column, value in zip(q.description, row)}
+
+        return self.session[attr]
 
-    async def _set(self, value: Any):
-        attr = inspect.stack()[2].function
+    async def _set(self, attr: str, value: Any):
+        if self.session is not None:
+            self.session[attr] = value
 
         await self.conn.execute(
             f"UPDATE sessions SET {attr} = ?",
@@ -285,29 +290,29 @@ class AioSQLiteStorage(Storage):
         )
         await self.conn.commit()
 
-    async def _accessor(self, value: Any = object):
-        return await self._get() if value == object else await self._set(value)
+    async def _accessor(self, attr: str, value: Any = object):
+        return await self._get(attr) if value == object else await self._set(attr, value)
 
     async def dc_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("dc_id", value)
 
     async def api_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("api_id", value)
 
     async def test_mode(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("test_mode", value)
 
     async def auth_key(self, value: bytes = object):
-        return await self._accessor(value)
+        return await self._accessor("auth_key", value)
 
     async def date(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("date", value)
 
     async def user_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("user_id", value)
 
     async def is_bot(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("is_bot", value)
 
     async def version(self, value: int = object):
         if value == object:
@@ -22,10 +22,15 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import asyncio
 import logging
 import os
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Optional
 
 from .sqlite_storage import SQLiteStorage
 
@@ -53,18 +58,192 @@ CREATE TABLE update_state
 );
 """
 
+DC_OPTIONS_SCHEMA = """
+CREATE TABLE dc_options
+(
+    id         INTEGER,
+    ip_address TEXT,
+    port       INTEGER,
+    is_ipv6    INTEGER,
+    is_media   INTEGER,
+    is_cdn     INTEGER,
+    test_mode  INTEGER
+);
+"""
+
 
 class FileStorage(SQLiteStorage):
+    """Storage engine that keeps the session in a SQLite file.
+
+    Parameters:
+        name (``str``):
+            The name of the session.
+
+        workdir (``Path``):
+            The directory the session file is stored in.
+
+        journal_mode (``str``, *optional*):
+            SQLite journal mode. WAL lets peer lookups run while the session is being written.
+            Defaults to "WAL".
+
+        synchronous (``str``, *optional*):
+            SQLite synchronous level: "OFF", "NORMAL", "FULL" or "EXTRA".
+            "NORMAL" is safe in WAL mode, but the last transactions may be lost on power loss.
+            Defaults to "NORMAL".
+
+        mmap_size (``int``, *optional*):
+            Maximum amount of bytes of the file SQLite maps in memory. 0 disables memory-mapped I/O.
+            Defaults to the SQLite default.
+
+        cache_size (``int``, *optional*):
+            SQLite page cache size of each connection. Positive values are in pages, negative values in KiB.
+            Defaults to the SQLite default.
+
+        read_connections (``int``, *optional*):
+            Amount of additional read-only connections, each in its own thread, used to look up peers concurrently
+            and without waiting for the writes. 0 runs the lookups on the only connection.
+            Defaults to 0.
+
+        max_peers (``int``, *optional*):
+            Maximum amount of peers to keep. The least recently updated peers beyond this amount are pruned.
+            Defaults to None (no limit).
+
+        max_peer_age (``int``, *optional*):
+            Seconds after which peers that weren't updated are pruned.
+            Defaults to None (no limit).
+
+        keep_contacts (``bool``, *optional*):
+            Pass False to prune contacts (peers whose phone number is known) as well.
+            Defaults to True.
+
+        keep_dialogs (``bool``, *optional*):
+            Pass False to prune the channels and supergroups whose updates are being tracked as well.
+            Defaults to True.
+
+        prune_interval (``int``, *optional*):
+            Seconds between two prunings in background, when either ``max_peers`` or ``max_peer_age`` is set.
+            Defaults to 3600.
+    """
+
     FILE_EXTENSION = ".session"
 
-    def __init__(self, name: str, workdir: Path):
+    # Peers updated this recently are in use and never pruned; this also covers the peers that the peer cache
+    # doesn't write again while they are unchanged
+    PRUNE_MIN_AGE = 2 * 60 * 60
+
+    # The file is only vacuumed when at least this fraction of its pages is free
+    VACUUM_MIN_FREE_RATIO = 0.25
+
+    def __init__(
+        self,
+        name: str,
+        workdir: Path,
+        journal_mode: str = "WAL",
+        synchronous: str = "NORMAL",
+        mmap_size: Optional[int] = None,
+        cache_size: Optional[int] = None,
+        read_connections: int = 0,
+        max_peers: Optional[int] = None,
+        max_peer_age: Optional[int] = None,
+        keep_contacts: bool = True,
+        keep_dialogs: bool = True,
+        prune_interval: int = 60 * 60
+    ):
         super().__init__(name)
 
         self.database = workdir / (self.name + self.FILE_EXTENSION)
 
+        self.journal_mode = journal_mode
+        self.synchronous = synchronous
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.read_connections = read_connections
+        self.max_peers = max_peers
+        self.max_peer_age = max_peer_age
+        self.keep_contacts = keep_contacts
+        self.keep_dialogs = keep_dialogs
+        self.prune_interval = prune_interval
+
+        self.prune_task = None  # type: Optional[asyncio.Task]
+        self.prune_event = asyncio.Event()
+
+        self.read_local = threading.local()
+        self.read_conns = []  # type: list[sqlite3.Connection]
+
+        if self.read_connections > 0:
+            self.read_executor = ThreadPoolExecutor(self.read_connections, thread_name_prefix="StorageReader")
+
     def _vacuum(self):
         with self.conn:
-            self.conn.execute("VACUUM")
+            page_count = self.conn.execute("PRAGMA page_count").fetchone()[0]
+            freelist_count = self.conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+            if freelist_count > page_count * self.VACUUM_MIN_FREE_RATIO:
+                self.conn.execute("VACUUM")
+
+    def _prune_impl(self) -> int:
+        now = int(time.time())
+        prunable = ["last_update_on < ?"]
+        pruned = 0
+
+        if self.keep_contacts:
+            prunable.append("phone_number IS NULL")
+
+        if self.keep_dialogs:
+            prunable.append("id NOT IN (SELECT id FROM update_state)")
+
+        prunable = " AND ".join(prunable)
+
+        with self.conn:
+            if self.max_peer_age is not None:
+                pruned += self.conn.execute(
+                    f"DELETE FROM peers WHERE {prunable}",
+                    (now - max(self.max_peer_age, self.PRUNE_MIN_AGE),)
+                ).rowcount
+
+            if self.max_peers is not None:
+                excess = self.conn.execute("SELECT COUNT(*) FROM peers").fetchone()[0] - self.max_peers
+
+                if excess > 0:
+                    pruned += self.conn.execute(
+                        f"DELETE FROM peers WHERE id IN ("
+                        f"SELECT id FROM peers WHERE {prunable} ORDER BY last_update_on ASC LIMIT ?"
+                        f")",
+                        (now - self.PRUNE_MIN_AGE, excess)
+                    ).rowcount
+
+            if pruned:
+                self.conn.execute("DELETE FROM usernames WHERE id NOT IN (SELECT id FROM peers)")
+
+        return pruned
+
+    async def prune_peers(self) -> int:
+        """Prune the peers according to the retention policy and vacuum the file if that freed enough space.
+
+        Returns:
+            ``int``: The amount of pruned peers.
+        """
+        pruned = await self.loop.run_in_executor(self.executor, self._prune_impl)
+
+        if pruned:
+            log.info("Pruned %s peers from %s", pruned, self.database)
+            await self.loop.run_in_executor(self.executor, self._vacuum)
+
+        return pruned
+
+    async def prune_worker(self):
+        while True:
+            try:
+                await self.prune_peers()
+            except Exception as e:
+                log.exception(e)
+
+            try:
+                await asyncio.wait_for(self.prune_event.wait(), self.prune_interval)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
 
     def _update_from_one_impl(self):
         with self.conn:
@@ -86,13 +265,41 @@ class FileStorage(SQLiteStorage):
         with self.conn:
             self.conn.executescript("CREATE INDEX idx_usernames_id ON usernames (id);")
 
+    def _update_from_six_impl(self):
+        with self.conn:
+            self.conn.executescript(DC_OPTIONS_SCHEMA)
+
+    def _tune(self, conn: sqlite3.Connection):
+        if self.mmap_size is not None:
+            conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}").close()
+
+        if self.cache_size is not None:
+            conn.execute(f"PRAGMA cache_size={int(self.cache_size)}").close()
+
     def _connect_impl(self, path):
         self.conn = sqlite3.connect(str(path), timeout=1, check_same_thread=False)
 
         with self.conn:
-            self.conn.execute("PRAGMA journal_mode=WAL").close()
-            self.conn.execute("PRAGMA synchronous=NORMAL").close()
+            self.conn.execute(f"PRAGMA journal_mode={self.journal_mode}").close()
+            self.conn.execute(f"PRAGMA synchronous={self.synchronous}").close()
             self.conn.execute("PRAGMA temp_store=1").close()
+            self._tune(self.conn)
+
+    def _get_read_conn(self) -> sqlite3.Connection:
+        if self.read_connections <= 0:
+            return self.conn
+
+        # Each reader thread lazily opens its own read-only connection
+        conn = getattr(self.read_local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(f"{self.database.absolute().as_uri()}?mode=ro", uri=True, timeout=1, check_same_thread=False)
+            self._tune(conn)
+
+            self.read_local.conn = conn
+            self.read_conns.append(conn)
+
+        return conn
 
     async def update(self):
         version = await self.version()
@@ -117,6 +324,10 @@ class FileStorage(SQLiteStorage):
             await self.loop.run_in_executor(self.executor, self._update_from_five_impl)
             version += 1
 
+        if version == 6:
+            await self.loop.run_in_executor(self.executor, self._update_from_six_impl)
+            version += 1
+
         await self.version(version)
 
     async def open(self):
@@ -132,5 +343,28 @@ class FileStorage(SQLiteStorage):
 
         await self.loop.run_in_executor(self.executor, self._vacuum)
 
+        if self.max_peers is not None or self.max_peer_age is not None:
+            self.prune_event.clear()
+            self.prune_task = asyncio.create_task(self.prune_worker())
+
+    def _close_readers_impl(self):
+        for conn in self.read_conns:
+            conn.close()
+
+        self.read_conns.clear()
+
+    async def close(self):
+        if self.prune_task is not None:
+            self.prune_event.set()
+            await self.prune_task
+            self.prune_task = None
+
+        if self.read_connections > 0:
+            # Once the readers are shut down, their connections can be closed from another thread
+            self.read_executor.shutdown()
+            await self.loop.run_in_executor(self.executor, self._close_readers_impl)
+
+        await super().close()
+
     async def delete(self):
         os.remove(self.database)
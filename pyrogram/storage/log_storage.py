@@ -0,0 +1,695 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import base64
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+from pathlib import Path
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from .sqlite_storage import get_input_peer
+from .storage import Storage
+
+log = logging.getLogger(__name__)
+
+PEER_TYPES = ["user", "bot", "group", "channel", "supergroup"]
+
+RECORD_HEADER = struct.Struct("<II")  # crc32 and length of the body
+RECORD = struct.Struct("<qqBqH")  # id, access hash, type, last update date, usernames count
+LENGTH = struct.Struct("<H")  # Length of each of the strings (phone number first, then usernames) after the record
+
+
+def encode_record(peer_id: int, access_hash: int, peer_type: str, usernames: list[str], phone_number: str, date: int):
+    body = [RECORD.pack(peer_id, access_hash or 0, PEER_TYPES.index(peer_type), date, len(usernames or []))]
+
+    for value in [phone_number or "", *(usernames or [])]:
+        value = value.encode()
+        body.append(LENGTH.pack(len(value)))
+        body.append(value)
+
+    body = b"".join(body)
+
+    return RECORD_HEADER.pack(zlib.crc32(body), len(body)) + body
+
+
+def decode_record(body: bytes) -> tuple[int, int, str, list[str], Optional[str], int]:
+    peer_id, access_hash, peer_type, date, count = RECORD.unpack_from(body)
+    position = RECORD.size
+    values = []
+
+    for _ in range(count + 1):
+        length, = LENGTH.unpack_from(body, position)
+        position += LENGTH.size
+        values.append(bytes(body[position:position + length]).decode())
+        position += length
+
+    return peer_id, access_hash, PEER_TYPES[peer_type], values[1:], values[0] or None, date
+
+
+def get_key(kind: bytes, value: Any) -> int:
+    # 0 marks the empty slots of the index
+    return int.from_bytes(blake2b(kind + str(value).encode(), digest_size=8).digest(), "little") or 1
+
+
+class PeerIndex:
+    """Open addressing hash table that maps keys (peer ids, usernames and phone numbers) to the offset of the
+    latest record of the peer in the log, kept in a memory-mapped file.
+
+    Keys are 64-bit hashes: two keys sharing a hash would share a slot, which is why the records found through the
+    index are checked against the key looked up.
+    """
+
+    MAGIC = b"PYRGIDX1"
+    HEADER = struct.Struct("<8sQQQQQB")  # magic, log generation, capacity, count, log size, dead bytes, clean
+    HEADER_SIZE = 64
+    SLOT = struct.Struct("<QQ")  # key, record offset
+    MIN_CAPACITY = 4096
+    MAX_LOAD = 0.7
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self.file = None
+        self.mmap = None  # type: Optional[mmap.mmap]
+
+        self.generation = 0
+        self.capacity = 0
+        self.count = 0
+        self.log_size = 0
+        self.dead = 0
+
+    def _map(self, path: Path, capacity: int):
+        file = open(path, "w+b")
+        file.truncate(self.HEADER_SIZE + capacity * self.SLOT.size)
+
+        return file, mmap.mmap(file.fileno(), 0)
+
+    def _insert(self, m: mmap.mmap, capacity: int, key: int, offset: int) -> int:
+        i = key % capacity
+
+        while True:
+            position = self.HEADER_SIZE + i * self.SLOT.size
+            slot_key, slot_offset = self.SLOT.unpack_from(m, position)
+
+            if slot_offset == 0 or slot_key == key:
+                self.SLOT.pack_into(m, position, key, offset)
+                return slot_offset
+
+            i = (i + 1) % capacity
+
+    def open(self) -> bool:
+        if not self.path.is_file() or self.path.stat().st_size < self.HEADER_SIZE:
+            return False
+
+        self.file = open(self.path, "r+b")
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+
+        magic, generation, capacity, count, log_size, dead, clean = self.HEADER.unpack_from(self.mmap)
+
+        if magic != self.MAGIC or not clean or len(self.mmap) != self.HEADER_SIZE + capacity * self.SLOT.size:
+            self.close()
+            return False
+
+        self.generation, self.capacity, self.count, self.log_size, self.dead = (
+            generation, capacity, count, log_size, dead
+        )
+
+        return True
+
+    def create(self, generation: int):
+        self.close()
+
+        self.file, self.mmap = self._map(self.path, self.MIN_CAPACITY)
+
+        self.generation = generation
+        self.capacity = self.MIN_CAPACITY
+        self.count = self.log_size = self.dead = 0
+
+        self.write_header()
+
+    def find(self, key: int) -> int:
+        i = key % self.capacity
+
+        while True:
+            slot_key, slot_offset = self.SLOT.unpack_from(self.mmap, self.HEADER_SIZE + i * self.SLOT.size)
+
+            if slot_offset == 0 or slot_key == key:
+                return slot_offset
+
+            i = (i + 1) % self.capacity
+
+    def put(self, key: int, offset: int) -> int:
+        old = self._insert(self.mmap, self.capacity, key, offset)
+
+        if old == 0:
+            self.count += 1
+
+            if self.count > self.capacity * self.MAX_LOAD:
+                self.resize(self.capacity * 2)
+
+        return old
+
+    def remove(self, key: int, offset: int):
+        """Remove a key, only if it still maps to the given offset (it may have moved to another peer since)."""
+        i = key % self.capacity
+
+        while True:
+            slot_key, slot_offset = self.SLOT.unpack_from(self.mmap, self.HEADER_SIZE + i * self.SLOT.size)
+
+            if slot_offset == 0:
+                return
+
+            if slot_key == key:
+                break
+
+            i = (i + 1) % self.capacity
+
+        if slot_offset != offset:
+            return
+
+        # Shift back the following keys of the probe sequence, so that they can still be found without tombstones
+        j = i
+
+        while True:
+            j = (j + 1) % self.capacity
+            slot_key, slot_offset = self.SLOT.unpack_from(self.mmap, self.HEADER_SIZE + j * self.SLOT.size)
+
+            if slot_offset == 0:
+                break
+
+            home = slot_key % self.capacity
+
+            # Keys whose home slot lies cyclically within (i, j] are already reachable
+            if (i < home <= j) if i < j else (home > i or home <= j):
+                continue
+
+            self.SLOT.pack_into(self.mmap, self.HEADER_SIZE + i * self.SLOT.size, slot_key, slot_offset)
+            i = j
+
+        self.SLOT.pack_into(self.mmap, self.HEADER_SIZE + i * self.SLOT.size, 0, 0)
+        self.count -= 1
+
+    def resize(self, capacity: int):
+        temp = self.path.with_name(self.path.name + ".tmp")
+        file, m = self._map(temp, capacity)
+
+        for i in range(self.capacity):
+            key, offset = self.SLOT.unpack_from(self.mmap, self.HEADER_SIZE + i * self.SLOT.size)
+
+            if offset:
+                self._insert(m, capacity, key, offset)
+
+        self.capacity = capacity
+
+        m.flush()
+        m.close()
+        file.close()
+        self.close()
+
+        os.replace(temp, self.path)
+
+        self.file = open(self.path, "r+b")
+        self.mmap = mmap.mmap(self.file.fileno(), 0)
+        self.write_header()
+
+    def write_header(self, clean: bool = False):
+        self.HEADER.pack_into(
+            self.mmap, 0,
+            self.MAGIC, self.generation, self.capacity, self.count, self.log_size, self.dead, clean
+        )
+
+    def flush(self):
+        self.mmap.flush()
+
+    def close(self):
+        if self.mmap is not None:
+            self.mmap.close()
+            self.mmap = None
+
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+class LogStorage(Storage):
+    """Storage engine that keeps peers in an append-only log with a memory-mapped hash index.
+
+    Suited for accounts that know millions of peers: opening the storage doesn't load any peer, lookups read a
+    single record and writes only append to the log. Records superseded by newer ones are dropped by compacting the
+    log once they take more than half of it. The session data is kept in a small JSON file next to the log, the update
+    states in another one that is written behind and only synced to disk when the storage is saved or closed.
+
+    The index is rebuilt from the log when it doesn't match it, e.g.: after a crash; records that were only partially
+    written are discarded then.
+
+    Parameters:
+        name (``str``):
+            The name of the session.
+
+        workdir (``Path``):
+            The directory the session files are stored in.
+    """
+
+    USERNAME_TTL = 8 * 60 * 60
+    COMPACT_MIN_SIZE = 4 * 1024 * 1024
+
+    LOG_MAGIC = b"PYRGLOG1"
+    LOG_HEADER = struct.Struct("<8sQ")  # magic, generation
+
+    def __init__(self, name: str, workdir: Path):
+        super().__init__(name)
+
+        self.state_path = workdir / (self.name + ".state")
+        self.updates_path = workdir / (self.name + ".updates")
+        self.log_path = workdir / (self.name + ".peers")
+        self.index = PeerIndex(workdir / (self.name + ".peers-index"))
+
+        self.executor = ThreadPoolExecutor(1)
+        self.loop = asyncio.get_event_loop()
+
+        self.log = None
+        self.generation = 0
+        self.state = None  # type: Optional[dict[str, Any]]
+
+        self.update_states = {}  # type: dict[str, list[int]]
+        self.updates_task = None  # type: Optional[asyncio.Task]
+        self.updates_dirty = False
+        self.updates_synced = True
+
+        # Held while the log is compacted or scanned, because compacting it moves the records
+        self.compact_lock = asyncio.Lock()
+
+    def _load_state_impl(self):
+        if not self.state_path.is_file():
+            self.state = {
+                "dc_id": 2, "api_id": None, "test_mode": None, "auth_key": None,
+                "date": 0, "user_id": None, "is_bot": None, "dc_options": []
+            }
+            self._save_state_impl(self._dump_state())
+            return
+
+        with open(self.state_path) as f:
+            self.state = json.load(f)
+
+        if self.state["auth_key"] is not None:
+            self.state["auth_key"] = base64.b64decode(self.state["auth_key"])
+
+        # Older state files carry the update states themselves
+        self.update_states = self.state.pop("update_state", {})
+
+        if self.updates_path.is_file():
+            try:
+                with open(self.updates_path) as f:
+                    self.update_states = json.load(f)
+            except ValueError:
+                # Not synced before a crash; the gaps since the last saved states can't be recovered
+                log.warning("Discarding the unreadable update states of %s", self.updates_path)
+
+    def _dump_state(self) -> str:
+        state = dict(self.state)
+
+        if state["auth_key"] is not None:
+            state["auth_key"] = base64.b64encode(state["auth_key"]).decode()
+
+        return json.dumps(state)
+
+    @staticmethod
+    def _replace_file_impl(path: Path, data: str, sync: bool = True):
+        # Replace the file atomically, so that it's never left half written
+        temp = path.with_name(path.name + ".tmp")
+
+        with open(temp, "w") as f:
+            f.write(data)
+
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+
+        os.replace(temp, path)
+
+    def _save_state_impl(self, data: str):
+        self._replace_file_impl(self.state_path, data)
+
+    async def _save_state(self):
+        # Serialized here, on the event loop thread: the state is changed from it while the file is being written
+        await self.loop.run_in_executor(self.executor, self._save_state_impl, self._dump_state())
+
+    async def _write_updates(self):
+        # The update states changed while a write is in progress are written by the next one
+        while self.updates_dirty:
+            self.updates_dirty = False
+            self.updates_synced = False
+
+            try:
+                await self.loop.run_in_executor(
+                    self.executor, self._replace_file_impl, self.updates_path, json.dumps(self.update_states), False
+                )
+            except Exception as e:
+                log.exception(e)
+
+    async def _sync_updates(self):
+        if self.updates_task is not None:
+            await self.updates_task
+            self.updates_task = None
+
+        if not self.updates_synced:
+            self.updates_synced = True
+            await self.loop.run_in_executor(
+                self.executor, self._replace_file_impl, self.updates_path, json.dumps(self.update_states)
+            )
+
+    def _create_log_impl(self, path: Path) -> int:
+        generation = int.from_bytes(os.urandom(8), "little")
+
+        with open(path, "wb") as f:
+            f.write(self.LOG_HEADER.pack(self.LOG_MAGIC, generation))
+            f.flush()
+            os.fsync(f.fileno())
+
+        return generation
+
+    def _scan(self) -> Iterator[tuple[int, int, tuple]]:
+        """Yield the offset, size and contents of the valid records of the log, truncating it at the first invalid
+        one."""
+        size = self.log.seek(0, os.SEEK_END)
+        offset = self.LOG_HEADER.size
+
+        if size > offset:
+            with mmap.mmap(self.log.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                while offset + RECORD_HEADER.size <= size:
+                    crc, length = RECORD_HEADER.unpack_from(data, offset)
+                    end = offset + RECORD_HEADER.size + length
+
+                    if end > size or zlib.crc32(data[offset + RECORD_HEADER.size:end]) != crc:
+                        break
+
+                    yield offset, end - offset, decode_record(data[offset + RECORD_HEADER.size:end])
+
+                    offset = end
+
+        if offset != size:
+            log.warning("Discarding %s bytes of incomplete peer records from %s", size - offset, self.log_path)
+            self.log.truncate(offset)
+            self.log.flush()
+
+    def _record_size(self, offset: int) -> int:
+        self.log.seek(offset)
+
+        return RECORD_HEADER.size + RECORD_HEADER.unpack(self.log.read(RECORD_HEADER.size))[1]
+
+    def _read_record(self, offset: int) -> tuple:
+        self.log.seek(offset)
+        _, length = RECORD_HEADER.unpack(self.log.read(RECORD_HEADER.size))
+
+        return decode_record(self.log.read(length))
+
+    def _index_record(self, offset: int, peer_id: int, usernames: list[str], phone_number: str):
+        old = self.index.put(get_key(b"i", peer_id), offset)
+
+        if old:
+            self.index.dead += self._record_size(old)
+
+            # The usernames and phone number the peer no longer has must not resolve to it anymore
+            _, _, _, old_usernames, old_phone_number, _ = self._read_record(old)
+
+            for username in set(old_usernames) - set(usernames or []):
+                self.index.remove(get_key(b"u", username), old)
+
+            if old_phone_number and old_phone_number != phone_number:
+                self.index.remove(get_key(b"p", old_phone_number), old)
+
+        for username in usernames or []:
+            self.index.put(get_key(b"u", username), offset)
+
+        if phone_number:
+            self.index.put(get_key(b"p", phone_number), offset)
+
+    def _rebuild_index_impl(self):
+        log.info("Rebuilding the peer index of %s", self.log_path)
+
+        self.index.create(self.generation)
+
+        for offset, size, (peer_id, _, _, usernames, phone_number, _) in self._scan():
+            self._index_record(offset, peer_id, usernames, phone_number)
+
+        self.index.log_size = self.log.seek(0, os.SEEK_END)
+        self.index.write_header()
+
+    def _open_log_impl(self):
+        if not self.log_path.is_file():
+            self._create_log_impl(self.log_path)
+
+        self.log = open(self.log_path, "a+b")
+        self.log.seek(0)
+
+        magic, self.generation = self.LOG_HEADER.unpack(self.log.read(self.LOG_HEADER.size))
+
+        if magic != self.LOG_MAGIC:
+            raise ValueError(f"Invalid peer log: {self.log_path}")
+
+        if not (
+            self.index.open()
+            and self.index.generation == self.generation
+            and self.index.log_size == self.log.seek(0, os.SEEK_END)
+        ):
+            self._rebuild_index_impl()
+
+        # Until it's closed cleanly, the index can't be trusted on the next open
+        self.index.write_header()
+        self.index.flush()
+
+    def _open_impl(self):
+        self._load_state_impl()
+        self._open_log_impl()
+
+    async def open(self):
+        await self.loop.run_in_executor(self.executor, self._open_impl)
+
+    def _sync_impl(self):
+        self.log.flush()
+        os.fsync(self.log.fileno())
+        self.index.flush()
+
+    async def save(self):
+        await self.date(int(time.time()))
+        await self._sync_updates()
+        await self.loop.run_in_executor(self.executor, self._sync_impl)
+
+    def _close_impl(self):
+        self._sync_impl()
+        self.log.close()
+
+        self.index.write_header(clean=True)
+        self.index.flush()
+        self.index.close()
+
+    async def close(self):
+        await self._sync_updates()
+        await self.loop.run_in_executor(self.executor, self._close_impl)
+        self.executor.shutdown()
+
+    async def delete(self):
+        for path in [self.state_path, self.updates_path, self.log_path, self.index.path]:
+            if path.is_file():
+                os.remove(path)
+
+    def _compact_impl(self):
+        temp = self.log_path.with_name(self.log_path.name + ".tmp")
+        generation = self._create_log_impl(temp)
+
+        with open(temp, "ab") as f:
+            for offset, size, (peer_id, *_) in self._scan():
+                # Keep only the latest record of each peer
+                if self.index.find(get_key(b"i", peer_id)) == offset:
+                    self.log.seek(offset)
+                    f.write(self.log.read(size))
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.log.close()
+        os.replace(temp, self.log_path)
+
+        self.log = open(self.log_path, "a+b")
+        self.generation = generation
+
+        self._rebuild_index_impl()
+
+    async def compact(self):
+        """Rewrite the peers log without the records superseded by newer ones."""
+        async with self.compact_lock:
+            await self.loop.run_in_executor(self.executor, self._compact_impl)
+
+    def _should_compact(self) -> bool:
+        return self.index.dead > self.COMPACT_MIN_SIZE and self.index.dead * 2 > self.index.log_size
+
+    def _update_peers_impl(self, peers: list[tuple[int, int, str, list[str], str]]):
+        date = int(time.time())
+        offset = self.index.log_size
+        records = []
+        entries = []
+
+        for peer_id, access_hash, peer_type, usernames, phone_number in peers:
+            record = encode_record(peer_id, access_hash, peer_type, usernames, phone_number, date)
+
+            records.append(record)
+            entries.append((offset, peer_id, usernames, phone_number))
+
+            offset += len(record)
+
+        self.log.write(b"".join(records))
+        self.log.flush()
+
+        for entry in entries:
+            self._index_record(*entry)
+
+        self.index.log_size = offset
+        self.index.write_header()
+
+    async def update_peers(self, peers: list[tuple[int, int, str, list[str], str]]):
+        if not peers:
+            return
+
+        await self.loop.run_in_executor(self.executor, self._update_peers_impl, peers)
+
+        # While the peers are being dumped the log is left as it is, it will be compacted after a later update
+        if self._should_compact() and not self.compact_lock.locked():
+            async with self.compact_lock:
+                if self._should_compact():
+                    await self.loop.run_in_executor(self.executor, self._compact_impl)
+
+    async def update_state(self, value: tuple[int, int, int, int, int] = object):
+        states = self.update_states
+
+        if value == object:
+            return sorted((tuple(state) for state in states.values()), key=lambda state: state[3] or 0)
+
+        if isinstance(value, int):
+            states.pop(str(value), None)
+        else:
+            states[str(value[0])] = list(value)
+
+        # Written behind: the many states of a flush end up in a single write, synced when the storage is saved
+        self.updates_dirty = True
+
+        if self.updates_task is None or self.updates_task.done():
+            self.updates_task = asyncio.ensure_future(self._write_updates())
+
+    def _next_peers_impl(self, records: Iterator[tuple[int, int, tuple]], batch_size: int) -> list[tuple]:
+        peers = []
+
+        for offset, _, (peer_id, access_hash, peer_type, usernames, phone_number, _) in records:
+            # Only the latest record of each peer is still valid
+            if self.index.find(get_key(b"i", peer_id)) == offset:
+                peers.append((peer_id, access_hash, peer_type, usernames or None, phone_number))
+
+                if len(peers) == batch_size:
+                    break
+
+        return peers
+
+    async def dump_peers(self, batch_size: int = 1000) -> AsyncIterator[list[tuple[int, int, str, list[str], str]]]:
+        # The offsets of the scan would no longer match the log if it was compacted in between
+        async with self.compact_lock:
+            records = self._scan()
+
+            try:
+                while True:
+                    peers = await self.loop.run_in_executor(self.executor, self._next_peers_impl, records, batch_size)
+
+                    if not peers:
+                        break
+
+                    yield peers
+            finally:
+                await self.loop.run_in_executor(self.executor, records.close)
+
+    def _find_record_impl(self, kind: bytes, value: Any) -> Optional[tuple]:
+        offset = self.index.find(get_key(kind, value))
+
+        return self._read_record(offset) if offset else None
+
+    async def get_peer_by_id(self, peer_id: int):
+        r = await self.loop.run_in_executor(self.executor, self._find_record_impl, b"i", peer_id)
+
+        if r is None or r[0] != peer_id:
+            raise KeyError(f"ID not found: {peer_id}")
+
+        return get_input_peer(*r[:3])
+
+    async def get_peer_by_username(self, username: str):
+        r = await self.loop.run_in_executor(self.executor, self._find_record_impl, b"u", username)
+
+        if r is None or username not in r[3]:
+            raise KeyError(f"Username not found: {username}")
+
+        if abs(time.time() - r[5]) > self.USERNAME_TTL:
+            raise KeyError(f"Username expired: {username}")
+
+        return get_input_peer(*r[:3])
+
+    async def get_peer_by_phone_number(self, phone_number: str):
+        r = await self.loop.run_in_executor(self.executor, self._find_record_impl, b"p", phone_number)
+
+        if r is None or r[4] != phone_number:
+            raise KeyError(f"Phone number not found: {phone_number}")
+
+        return get_input_peer(*r[:3])
+
+    async def _accessor(self, attr: str, value: Any = object):
+        if value == object:
+            return self.state[attr]
+
+        self.state[attr] = value
+        await self._save_state()
+
+    async def dc_id(self, value: int = object):
+        return await self._accessor("dc_id", value)
+
+    async def api_id(self, value: int = object):
+        return await self._accessor("api_id", value)
+
+    async def test_mode(self, value: bool = object):
+        return await self._accessor("test_mode", value)
+
+    async def auth_key(self, value: bytes = object):
+        return await self._accessor("auth_key", value)
+
+    async def date(self, value: int = object):
+        return await self._accessor("date", value)
+
+    async def user_id(self, value: int = object):
+        return await self._accessor("user_id", value)
+
+    async def is_bot(self, value: bool = object):
+        return await self._accessor("is_bot", value)
+
+    async def dc_options(self, value: list[tuple[int, str, int, bool, bool, bool, bool]] = object):
+        if value == object:
+            return [tuple(option) for option in self.state.get("dc_options", [])]
+
+        self.state["dc_options"] = [list(option) for option in value]
+        await self._save_state()
@@ -0,0 +1,162 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+from .storage import Storage
+from .. import utils
+
+
+class PeerCache:
+    """Bounded LRU cache of resolved peers layered over any storage engine.
+
+    Peers are looked up in memory first and only go to the storage engine on a miss; peers that are written through
+    :meth:`update_peers` are dropped from the cache, so that the next lookup reads their new access hash.
+
+    A fingerprint of the last written data of each peer is kept as well, so that :meth:`update_peers` only writes the
+    peers that actually changed.
+
+    Parameters:
+        storage (:obj:`~pyrogram.storage.Storage`):
+            The storage engine the peers are read from and written to.
+
+        capacity (``int``):
+            The maximum amount of peers (and, separately, of usernames and phone numbers) kept in memory.
+    """
+
+    # Usernames can change without the client noticing; don't trust a cached one for long
+    USERNAME_TTL = 5 * 60
+
+    # Unchanged peers are still written once in a while, to keep their last update date (and usernames) fresh
+    FINGERPRINT_TTL = 60 * 60
+
+    def __init__(self, storage: Storage, capacity: int):
+        self.storage = storage
+        self.capacity = capacity
+
+        self.peers = OrderedDict()  # type: OrderedDict[int, Any]
+        self.usernames = OrderedDict()  # type: OrderedDict[str, tuple[int, float]]
+        self.phone_numbers = OrderedDict()  # type: OrderedDict[str, int]
+        self.fingerprints = OrderedDict()  # type: OrderedDict[int, tuple[tuple, float]]
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.peers)
+
+    def _put(self, cache: OrderedDict, key: Any, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+
+        if len(cache) > self.capacity:
+            cache.popitem(last=False)
+
+    def _get_cached_peer(self, peer_id: Optional[int]):
+        input_peer = self.peers.get(peer_id)
+
+        if input_peer is None:
+            self.misses += 1
+            return None
+
+        self.peers.move_to_end(peer_id)
+        self.hits += 1
+
+        return input_peer
+
+    @staticmethod
+    def _get_peer_id(input_peer) -> int:
+        if hasattr(input_peer, "user_id"):
+            return input_peer.user_id
+
+        if hasattr(input_peer, "chat_id"):
+            return -input_peer.chat_id
+
+        return utils.get_channel_id(input_peer.channel_id)
+
+    async def get_peer_by_id(self, peer_id: int):
+        input_peer = self._get_cached_peer(peer_id)
+
+        if input_peer is None:
+            input_peer = await self.storage.get_peer_by_id(peer_id)
+            self._put(self.peers, peer_id, input_peer)
+
+        return input_peer
+
+    async def get_peer_by_username(self, username: str):
+        cached = self.usernames.get(username)
+        input_peer = None
+
+        if cached is not None and time.monotonic() - cached[1] < self.USERNAME_TTL:
+            input_peer = self._get_cached_peer(cached[0])
+        else:
+            self.misses += 1
+
+        if input_peer is None:
+            input_peer = await self.storage.get_peer_by_username(username)
+            peer_id = self._get_peer_id(input_peer)
+
+            self._put(self.peers, peer_id, input_peer)
+            self._put(self.usernames, username, (peer_id, time.monotonic()))
+
+        return input_peer
+
+    async def get_peer_by_phone_number(self, phone_number: str):
+        input_peer = self._get_cached_peer(self.phone_numbers.get(phone_number))
+
+        if input_peer is None:
+            input_peer = await self.storage.get_peer_by_phone_number(phone_number)
+            peer_id = self._get_peer_id(input_peer)
+
+            self._put(self.peers, peer_id, input_peer)
+            self._put(self.phone_numbers, phone_number, peer_id)
+
+        return input_peer
+
+    async def update_peers(self, peers: list[tuple[int, int, str, list[str], str]]):
+        now = time.monotonic()
+        changed = []
+        fingerprints = []
+
+        for peer_id, access_hash, peer_type, usernames, phone_number in peers:
+            fingerprint = (access_hash, peer_type, tuple(usernames) if usernames else None, phone_number)
+            last = self.fingerprints.get(peer_id)
+
+            if last is not None and last[0] == fingerprint and now - last[1] < self.FINGERPRINT_TTL:
+                continue
+
+            changed.append((peer_id, access_hash, peer_type, usernames, phone_number))
+            fingerprints.append((peer_id, fingerprint))
+
+        if not changed:
+            return
+
+        await self.storage.update_peers(changed)
+
+        # Stale username and phone number entries point to ids that are no longer cached and are simply missed
+        for peer_id, fingerprint in fingerprints:
+            self.peers.pop(peer_id, None)
+            self._put(self.fingerprints, peer_id, (fingerprint, now))
+
+    def clear(self):
+        self.peers.clear()
+        self.usernames.clear()
+        self.phone_numbers.clear()
+        self.fingerprints.clear()
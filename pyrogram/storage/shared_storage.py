@@ -0,0 +1,310 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from .sqlite_storage import SQLiteStorage
+
+# language=SQLite
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions
+(
+    name      TEXT PRIMARY KEY,
+    dc_id     INTEGER,
+    api_id    INTEGER,
+    test_mode INTEGER,
+    auth_key  BLOB,
+    date      INTEGER NOT NULL,
+    user_id   INTEGER,
+    is_bot    INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS peers
+(
+    session        TEXT    NOT NULL,
+    id             INTEGER NOT NULL,
+    access_hash    INTEGER,
+    type           TEXT    NOT NULL,
+    phone_number   TEXT,
+    last_update_on INTEGER NOT NULL,
+    PRIMARY KEY (session, id)
+);
+
+CREATE TABLE IF NOT EXISTS usernames
+(
+    id       INTEGER NOT NULL,
+    username TEXT    NOT NULL,
+    PRIMARY KEY (username, id)
+);
+
+CREATE TABLE IF NOT EXISTS update_state
+(
+    session TEXT    NOT NULL,
+    id      INTEGER NOT NULL,
+    pts     INTEGER,
+    qts     INTEGER,
+    date    INTEGER,
+    seq     INTEGER,
+    PRIMARY KEY (session, id)
+);
+
+CREATE TABLE IF NOT EXISTS dc_options
+(
+    session    TEXT NOT NULL,
+    id         INTEGER,
+    ip_address TEXT,
+    port       INTEGER,
+    is_ipv6    INTEGER,
+    is_media   INTEGER,
+    is_cdn     INTEGER,
+    test_mode  INTEGER
+);
+
+CREATE TABLE IF NOT EXISTS version
+(
+    number INTEGER PRIMARY KEY
+);
+
+CREATE INDEX IF NOT EXISTS idx_peers_phone_number ON peers (session, phone_number);
+CREATE INDEX IF NOT EXISTS idx_usernames_id ON usernames (id);
+CREATE INDEX IF NOT EXISTS idx_dc_options_session ON dc_options (session);
+"""
+
+
+class SharedDatabase:
+    """SQLite database that hosts the sessions of many clients.
+
+    All the :obj:`~pyrogram.storage.SharedStorage` instances of a database share its only connection and thread.
+    The database is opened with the first storage and closed with the last one.
+
+    Parameters:
+        path (``Path``):
+            The path of the database file.
+    """
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+
+        self.executor = ThreadPoolExecutor(1, thread_name_prefix="SharedStorage")
+        self.conn = None  # type: Optional[sqlite3.Connection]
+
+        self.users = 0
+        self.ready = None  # type: Optional[asyncio.Future]
+
+    def _connect_impl(self):
+        self.conn = sqlite3.connect(str(self.path), timeout=1, check_same_thread=False)
+
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL").close()
+            self.conn.execute("PRAGMA synchronous=NORMAL").close()
+            self.conn.execute("PRAGMA temp_store=1").close()
+
+            self.conn.executescript(SCHEMA)
+
+            if self.conn.execute("SELECT number FROM version").fetchone() is None:
+                self.conn.execute("INSERT INTO version VALUES (?)", (self.VERSION,))
+
+    def _close_impl(self):
+        self.conn.commit()
+        self.conn.close()
+        self.conn = None
+
+    async def acquire(self):
+        self.users += 1
+
+        if self.users == 1:
+            self.ready = asyncio.get_event_loop().run_in_executor(self.executor, self._connect_impl)
+
+        await self.ready
+
+    async def release(self):
+        self.users -= 1
+
+        if self.users == 0:
+            await asyncio.get_event_loop().run_in_executor(self.executor, self._close_impl)
+
+
+class SharedStorage(SQLiteStorage):
+    """Storage engine that keeps a session in a database shared by many clients.
+
+    Sessions are stored by name; peers, update states and data center addresses are kept per session, because
+    access hashes are only valid for the account that received them, while usernames are public and stored once for
+    all the sessions.
+
+    Parameters:
+        name (``str``):
+            The name of the session.
+
+        database (:obj:`~pyrogram.storage.SharedDatabase`):
+            The database shared by the clients.
+    """
+
+    def __init__(self, name: str, database: SharedDatabase):
+        super().__init__(name)
+
+        self.database = database
+
+        self.executor = database.executor
+        self.read_executor = database.executor
+
+    def _open_impl(self):
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO sessions (name, dc_id, date) VALUES (?, ?, ?)",
+                (self.name, 2, 0)
+            )
+
+    async def open(self):
+        await self.database.acquire()
+
+        self.conn = self.database.conn
+        await self.loop.run_in_executor(self.executor, self._open_impl)
+
+    async def close(self):
+        self.conn = None
+        await self.database.release()
+
+    def _delete_impl(self):
+        with self.conn:
+            for table in ["sessions", "peers", "update_state", "dc_options"]:
+                column = "name" if table == "sessions" else "session"
+                self.conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (self.name,))
+
+    async def delete(self):
+        # Called after close, the database may be closed by now
+        await self.database.acquire()
+
+        self.conn = self.database.conn
+        await self.loop.run_in_executor(self.executor, self._delete_impl)
+        await self.close()
+
+    def _update_peers_impl(self, peers):
+        now = int(time.time())
+
+        with self.conn:
+            self.conn.executemany(
+                "REPLACE INTO peers (session, id, access_hash, type, phone_number, last_update_on) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(self.name, id, access_hash, type, phone_number, now) for id, access_hash, type, _, phone_number in peers]
+            )
+
+            # Usernames are shared: the other sessions have often written the same ones already
+            for id, _, _, usernames, _ in peers:
+                usernames = set(usernames or [])
+                stored = {r[0] for r in self.conn.execute("SELECT username FROM usernames WHERE id = ?", (id,))}
+
+                if usernames == stored:
+                    continue
+
+                self.conn.execute("DELETE FROM usernames WHERE id = ?", (id,))
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO usernames (id, username) VALUES (?, ?)",
+                    [(id, username) for username in usernames]
+                )
+
+    def _update_state_impl(self, value: tuple[int, int, int, int, int] = object):
+        if value == object:
+            return self.conn.execute(
+                "SELECT id, pts, qts, date, seq FROM update_state WHERE session = ? "
+                "ORDER BY date ASC",
+                (self.name,)
+            ).fetchall()
+        else:
+            with self.conn:
+                if isinstance(value, int):
+                    self.conn.execute(
+                        "DELETE FROM update_state WHERE session = ? AND id = ?",
+                        (self.name, value)
+                    )
+                else:
+                    self.conn.execute(
+                        "REPLACE INTO update_state (session, id, pts, qts, date, seq) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.name, *value)
+                    )
+
+    def _dc_options_impl(self, value):
+        with self.conn:
+            if value == object:
+                return [
+                    (dc_id, ip_address, port, bool(is_ipv6), bool(is_media), bool(is_cdn), bool(test_mode))
+                    for dc_id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode in self.conn.execute(
+                        "SELECT id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode FROM dc_options "
+                        "WHERE session = ?",
+                        (self.name,)
+                    )
+                ]
+
+            self.conn.execute("DELETE FROM dc_options WHERE session = ?", (self.name,))
+            self.conn.executemany(
+                "INSERT INTO dc_options (session, id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(self.name, *option) for option in value]
+            )
+
+    def _dump_peers_impl(self, after: int, batch_size: int):
+        return self.conn.execute(
+            "SELECT p.id, p.access_hash, p.type, GROUP_CONCAT(u.username, ' '), p.phone_number FROM peers p "
+            "LEFT JOIN usernames u ON p.id = u.id "
+            "WHERE p.session = ? AND p.id > ? "
+            "GROUP BY p.id "
+            "ORDER BY p.id "
+            "LIMIT ?",
+            (self.name, after, batch_size)
+        ).fetchall()
+
+    def _get_peer_by_id_impl(self, peer_id: int):
+        return self.conn.execute(
+            "SELECT id, access_hash, type FROM peers WHERE session = ? AND id = ?",
+            (self.name, peer_id)
+        ).fetchone()
+
+    def _get_peer_by_username_impl(self, username: str):
+        return self.conn.execute(
+            "SELECT p.id, p.access_hash, p.type, p.last_update_on FROM peers p "
+            "JOIN usernames u ON p.id = u.id "
+            "WHERE p.session = ? AND u.username = ? "
+            "ORDER BY p.last_update_on DESC",
+            (self.name, username)
+        ).fetchone()
+
+    def _get_peer_by_phone_number_impl(self, phone_number: str):
+        return self.conn.execute(
+            "SELECT id, access_hash, type FROM peers WHERE session = ? AND phone_number = ?",
+            (self.name, phone_number)
+        ).fetchone()
+
+    def _get_session_impl(self):
+        cursor = self.conn.execute(
+            "SELECT dc_id, api_id, test_mode, auth_key, date, user_id, is_bot FROM sessions WHERE name = ?",
+            (self.name,)
+        )
+        row = cursor.fetchone()
+
+        return {column[0]: value for column, value in zip(cursor.description, row)}
+
+    def _set_impl(self, attr: str, value: Any):
+        with self.conn:
+            return self.conn.execute(f"UPDATE sessions SET {attr} = ? WHERE name = ?", (value, self.name))
@@ -22,11 +22,10 @@
 #  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
 
 import asyncio
-import inspect
 import sqlite3
 import time
 from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+from typing import Any, AsyncIterator
 
 from pyrogram import raw
 from .storage import Storage
@@ -70,6 +69,17 @@ CREATE TABLE update_state
     seq  INTEGER
 );
 
+CREATE TABLE dc_options
+(
+    id         INTEGER,
+    ip_address TEXT,
+    port       INTEGER,
+    is_ipv6    INTEGER,
+    is_media   INTEGER,
+    is_cdn     INTEGER,
+    test_mode  INTEGER
+);
+
 CREATE TABLE version
 (
     number INTEGER PRIMARY KEY
@@ -113,15 +123,18 @@ def get_input_peer(peer_id: int, access_hash: int, peer_type: str):
 
 
 class SQLiteStorage(Storage):
-    VERSION = 6
+    VERSION = 7
     USERNAME_TTL = 8 * 60 * 60
 
     def __init__(self, name: str):
         super().__init__(name)
 
         self.executor = ThreadPoolExecutor(1)
+        # Peer lookups run here; subclasses may point it to a pool of read connections
+        self.read_executor = self.executor
         self.loop = asyncio.get_event_loop()
         self.conn = None  # type: sqlite3.Connection | None
+        self.session = None  # type: dict[str, Any] | None
 
     def _create_impl(self):
         with self.conn:
@@ -185,6 +198,35 @@ class SQLiteStorage(Storage):
     async def update_peers(self, peers: list[tuple[int, int, str, list[str], str]]):
         return await self.loop.run_in_executor(self.executor, self._update_peers_impl, peers)
 
+    def _dump_peers_impl(self, after: int, batch_size: int):
+        with self._get_read_conn() as conn:
+            return conn.execute(
+                "SELECT p.id, p.access_hash, p.type, GROUP_CONCAT(u.username, ' '), p.phone_number FROM peers p "
+                "LEFT JOIN usernames u ON p.id = u.id "
+                "WHERE p.id > ? "
+                "GROUP BY p.id "
+                "ORDER BY p.id "
+                "LIMIT ?",
+                (after, batch_size)
+            ).fetchall()
+
+    async def dump_peers(self, batch_size: int = 1000) -> AsyncIterator[list[tuple[int, int, str, list[str], str]]]:
+        after = -(2 ** 63)
+
+        # Paginate by id instead of keeping a cursor open, so that writes can go on in between batches
+        while True:
+            rows = await self.loop.run_in_executor(self.read_executor, self._dump_peers_impl, after, batch_size)
+
+            if not rows:
+                break
+
+            yield [
+                (id, access_hash, type, usernames.split(" ") if usernames else None, phone_number)
+                for id, access_hash, type, usernames, phone_number in rows
+            ]
+
+            after = rows[-1][0]
+
     def _update_state_impl(self, value: tuple[int, int, int, int, int] = object):
         if value == object:
             return self.conn.execute(
@@ -208,15 +250,18 @@ class SQLiteStorage(Storage):
     async def update_state(self, value: tuple[int, int, int, int, int] = object):
         return await self.loop.run_in_executor(self.executor, self._update_state_impl, value)
 
+    def _get_read_conn(self) -> sqlite3.Connection:
+        return self.conn
+
     def _get_peer_by_id_impl(self, peer_id: int):
-        with self.conn:
-            return self.conn.execute(
+        with self._get_read_conn() as conn:
+            return conn.execute(
                 "SELECT id, access_hash, type FROM peers WHERE id = ?",
                 (peer_id,)
             ).fetchone()
 
     async def get_peer_by_id(self, peer_id: int):
-        r = await self.loop.run_in_executor(self.executor, self._get_peer_by_id_impl, peer_id)
+        r = await self.loop.run_in_executor(self.read_executor, self._get_peer_by_id_impl, peer_id)
 
         if r is None:
             raise KeyError(f"ID not found: {peer_id}")
@@ -224,8 +269,8 @@ class SQLiteStorage(Storage):
         return get_input_peer(*r)
 
     def _get_peer_by_username_impl(self, username: str):
-        with self.conn:
-            return self.conn.execute(
+        with self._get_read_conn() as conn:
+            return conn.execute(
                 "SELECT p.id, p.access_hash, p.type, p.last_update_on FROM peers p "
                 "JOIN usernames u ON p.id = u.id "
                 "WHERE u.username = ? "
@@ -234,7 +279,7 @@ class SQLiteStorage(Storage):
             ).fetchone()
 
     async def get_peer_by_username(self, username: str):
-        r = await self.loop.run_in_executor(self.executor, self._get_peer_by_username_impl, username)
+        r = await self.loop.run_in_executor(self.read_executor, self._get_peer_by_username_impl, username)
 
         if r is None:
             raise KeyError(f"Username not found: {username}")
@@ -245,47 +290,63 @@ class SQLiteStorage(Storage):
         return get_input_peer(*r[:3])
 
     def _get_peer_by_phone_number_impl(self, phone_number: str):
-        with self.conn:
-            return self.conn.execute(
+        with self._get_read_conn() as conn:
+            return conn.execute(
                 "SELECT id, access_hash, type FROM peers WHERE phone_number = ?",
                 (phone_number,)
             ).fetchone()
 
     async def get_peer_by_phone_number(self, phone_number: str):
-        r = await self.loop.run_in_executor(self.executor, self._get_peer_by_phone_number_impl, phone_number)
+        r = await self.loop.run_in_executor(self.read_executor, self._get_peer_by_phone_number_impl, phone_number)
 
         if r is None:
             raise KeyError(f"Phone number not found: {phone_number}")
 
         return get_input_peer(*r)
 
-    def _get_impl(self, attr: str):
+    def _get_session_impl(self):
         with self.conn:
-            return self.conn.execute(f"SELECT {attr} FROM sessions").fetchone()[0]
+            cursor = self.conn.execute("SELECT * FROM sessions")
+            row = cursor.fetchone()
+
+            return {column[0]: value for column, value in zip(cursor.description, row)}
 
-    # async def _get(self, attr: str):
-    #     return await self.loop.run_in_executor(self.executor, self._get_impl, attr)
+    async def _get(self, attr: str):
+        # The sessions row is read once and then served from memory
+        if self.session is None:
+            self.session = await self.loop.run_in_executor(self.executor, self._get_session_impl)
 
-    async def _get(self):
-        attr = inspect.stack()[2].function
-        return await self.loop.run_in_executor(self.executor, self._get_impl, attr)
+        return self.session[attr]
 
-    def _set_impl(self, attr: str, value: any):
+    def _set_impl(self, attr: str, value: Any):
         with self.conn:
             return self.conn.execute(f"UPDATE sessions SET {attr} = ?", (value,))
 
-    # async def _set(self, attr: str, value: Any):
-    #     return await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
-
-    async def _set(self, value: Any):
-        attr = inspect.stack()[2].function
+    async def _set(self, attr: str, value: Any):
+        if self.session is not None:
+            self.session[attr] = value
 
         return await self.loop.run_in_executor(self.executor, self._set_impl, attr, value)
 
-    async def _accessor(self, value: Any = object):
-        # return await self._get(attr) if value == object else await self._set(attr, value)
-        return await self._get() if value == object else await self._set(value)
-    
+    async def _accessor(self, attr: str, value: Any = object):
+        return await self._get(attr) if value == object else await self._set(attr, value)
+
+    def _dc_options_impl(self, value):
+        with self.conn:
+            if value == object:
+                return [
+                    (dc_id, ip_address, port, bool(is_ipv6), bool(is_media), bool(is_cdn), bool(test_mode))
+                    for dc_id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode in self.conn.execute(
+                        "SELECT id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode FROM dc_options"
+                    )
+                ]
+
+            self.conn.execute("DELETE FROM dc_options")
+            self.conn.executemany("INSERT INTO dc_options VALUES (?, ?, ?, ?, ?, ?, ?)", value)
+
+    async def dc_options(self, value: list[tuple[int, str, int, bool, bool, bool, bool]] = object):
+        return await self.loop.run_in_executor(self.executor, self._dc_options_impl, value)
+
     def _get_version_impl(self):
         with self.conn:
             return self.conn.execute("SELECT number FROM version").fetchone()[0]
@@ -295,25 +356,25 @@ class SQLiteStorage(Storage):
             return self.conn.execute("UPDATE version SET number = ?", (value,))
 
     async def dc_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("dc_id", value)
 
     async def api_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("api_id", value)
 
     async def test_mode(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("test_mode", value)
 
     async def auth_key(self, value: bytes = object):
-        return await self._accessor(value)
+        return await self._accessor("auth_key", value)
 
     async def date(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("date", value)
 
     async def user_id(self, value: int = object):
-        return await self._accessor(value)
+        return await self._accessor("user_id", value)
 
     async def is_bot(self, value: bool = object):
-        return await self._accessor(value)
+        return await self._accessor("is_bot", value)
 
     async def version(self, value: int = object):
         if value == object:
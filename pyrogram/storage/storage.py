@@ -24,6 +24,7 @@
 from abc import ABC, abstractmethod
 import base64
 import struct
+from typing import AsyncIterable, AsyncIterator
 
 
 class Storage(ABC):
@@ -196,6 +197,65 @@ class Storage(ABC):
         """
         raise NotImplementedError
 
+    async def dc_options(self, value: list[tuple[int, str, int, bool, bool, bool, bool]] = object):
+        """Get or set the cached addresses of the data centers, as received from the server.
+
+        Storage engines that don't implement this method won't keep the addresses across restarts.
+
+        Parameters:
+            value (``list``, *optional*):
+                The addresses to set, as tuples of (dc_id, ip_address, port, is_ipv6, is_media, is_cdn, test_mode).
+        """
+        raise NotImplementedError
+
+    def dump_peers(self, batch_size: int = 1000) -> AsyncIterator[list[tuple[int, int, str, list[str], str]]]:
+        """Iterate over the stored peers, in batches.
+
+        Storage engines that can list their peers should implement this method to be used as a source of
+        :meth:`copy_to`.
+
+        Parameters:
+            batch_size (``int``, *optional*):
+                The maximum amount of peers in each batch.
+                Defaults to 1000.
+
+        Returns:
+            ``AsyncIterator``: An asynchronous iterator of lists of peers, in the same format accepted by
+            :meth:`update_peers`.
+        """
+        raise NotImplementedError
+
+    async def load_peers(self, batches: AsyncIterable[list[tuple[int, int, str, list[str], str]]]):
+        """Store peers coming in batches, e.g.: from :meth:`dump_peers` of another storage engine.
+
+        Parameters:
+            batches (``AsyncIterable``):
+                An asynchronous iterable of lists of peers, in the same format accepted by :meth:`update_peers`.
+        """
+        async for peers in batches:
+            await self.update_peers(peers)
+
+    async def copy_to(self, storage: "Storage", batch_size: int = 1000):
+        """Copy the session, the update states and the peers to another, already opened, storage engine.
+
+        Useful to move a session between storage engines without losing the known peers, or to take a snapshot of it.
+
+        Parameters:
+            storage (:obj:`~pyrogram.storage.Storage`):
+                The storage engine to copy to.
+
+            batch_size (``int``, *optional*):
+                The maximum amount of peers copied at once.
+                Defaults to 1000.
+        """
+        for attr in ["dc_id", "api_id", "test_mode", "auth_key", "date", "user_id", "is_bot"]:
+            await getattr(storage, attr)(await getattr(self, attr)())
+
+        for state in await self.update_state():
+            await storage.update_state(tuple(state))
+
+        await storage.load_peers(self.dump_peers(batch_size))
+
     async def export_session_string(self):
         """Exports the session string for the current session.
 
@@ -0,0 +1,93 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import logging
+from typing import Optional
+
+from .storage import Storage
+
+log = logging.getLogger(__name__)
+
+
+class UpdateStateTracker:
+    """Write-behind buffer for the update states of a storage engine.
+
+    Keeps the latest update state of each chat in memory and writes them to the storage engine every
+    :attr:`FLUSH_INTERVAL` seconds (and whenever :meth:`flush` is called), so that updates don't wait for a storage
+    write each.
+
+    Parameters:
+        storage (:obj:`~pyrogram.storage.Storage`):
+            The storage engine the update states are written to.
+    """
+
+    FLUSH_INTERVAL = 5
+
+    def __init__(self, storage: Storage):
+        self.storage = storage
+
+        self.pending = {}  # type: dict[int, tuple[int, int, int, int, int]]
+        self.lock = asyncio.Lock()
+        self.event = asyncio.Event()
+        self.task = None  # type: Optional[asyncio.Task]
+
+    def update(self, value: tuple[int, int, int, int, int]):
+        # Only the latest state of each chat is worth writing
+        self.pending[value[0]] = value
+
+    async def flush(self):
+        async with self.lock:
+            pending, self.pending = self.pending, {}
+
+            try:
+                for value in pending.values():
+                    await self.storage.update_state(value)
+            except BaseException:
+                # Put back what wasn't written, unless a newer state arrived in the meantime
+                for key, value in pending.items():
+                    self.pending.setdefault(key, value)
+
+                raise
+
+    async def worker(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.event.wait(), self.FLUSH_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                break
+
+            try:
+                await self.flush()
+            except Exception as e:
+                log.exception(e)
+
+    def start(self):
+        self.event.clear()
+        self.task = asyncio.create_task(self.worker())
+
+    async def stop(self):
+        self.event.set()
+
+        if self.task is not None:
+            await self.task
+            self.task = None
+
+        await self.flush()
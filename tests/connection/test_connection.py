@@ -0,0 +1,69 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram.connection import Connection
+
+# Seconds each fake address takes to connect, None never connects
+DELAYS = {"::1": None, "10.0.0.1": 0.05, "10.0.0.2": 0.01, "10.0.0.3": 0}
+
+
+class FakeTCP:
+    closed = []
+
+    def __init__(self, ipv6, proxy):
+        self.ipv6 = ipv6
+
+    async def connect(self, address):
+        delay = DELAYS[address[0]]
+
+        if delay is None:
+            raise OSError("Network unreachable")
+
+        await asyncio.sleep(delay)
+
+    def close(self):
+        FakeTCP.closed.append(self)
+
+
+@pytest.mark.asyncio
+async def test_race(monkeypatch):
+    monkeypatch.setattr(Connection, "STAGGER", 0.02)
+
+    connection = Connection(2, False, True, None)
+    connection.mode = FakeTCP
+
+    # The unreachable address fails right away, the second one is slower than the third, started after the stagger
+    protocol, address = await connection.race([("::1", 443), ("10.0.0.1", 443), ("10.0.0.2", 443)])
+
+    assert address == ("10.0.0.2", 443)
+    assert not protocol.ipv6
+    assert len(FakeTCP.closed) == 2 and protocol not in FakeTCP.closed
+
+    # Once connected, the next addresses are not tried
+    FakeTCP.closed.clear()
+    protocol, address = await connection.race([("10.0.0.3", 443), ("10.0.0.1", 443)])
+
+    assert address == ("10.0.0.3", 443)
+    assert FakeTCP.closed == []
+
+    with pytest.raises(OSError):
+        await connection.race([("::1", 443)])
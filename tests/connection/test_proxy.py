@@ -0,0 +1,148 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import base64
+import ipaddress
+import os
+from struct import pack, unpack
+
+import pytest
+
+from pyrogram.connection.transport import TCPIntermediate
+
+USERNAME = "user"
+PASSWORD = "pass"
+
+
+async def relay(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while data := await reader.read(65536):
+            writer.write(data)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def open_tunnel(host: str, port: int, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    target_reader, target_writer = await asyncio.open_connection(host, port)
+    await asyncio.gather(relay(reader, target_writer), relay(target_reader, writer))
+
+
+async def socks4(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    _, command, port = unpack(">BBH", await reader.readexactly(4))
+    host = str(ipaddress.IPv4Address(await reader.readexactly(4)))
+    user_id = (await reader.readuntil(b"\x00"))[:-1]
+
+    if user_id != USERNAME.encode():
+        writer.write(pack(">BBH4s", 0, 0x5B, 0, b"\x00" * 4))
+        return writer.close()
+
+    writer.write(pack(">BBH4s", 0, 0x5A, 0, b"\x00" * 4))
+    await open_tunnel(host, port, reader, writer)
+
+
+async def socks5(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    _, count = await reader.readexactly(2)
+    methods = await reader.readexactly(count)
+
+    if 2 not in methods:
+        writer.write(b"\x05\xff")
+        return writer.close()
+
+    writer.write(b"\x05\x02")
+
+    _, length = await reader.readexactly(2)
+    username = await reader.readexactly(length)
+    length = (await reader.readexactly(1))[0]
+    password = await reader.readexactly(length)
+
+    if (username, password) != (USERNAME.encode(), PASSWORD.encode()):
+        writer.write(b"\x01\x01")
+        return writer.close()
+
+    writer.write(b"\x01\x00")
+
+    _, command, _, address_type = await reader.readexactly(4)
+    host = str(ipaddress.ip_address(await reader.readexactly(4 if address_type == 1 else 16)))
+    port = unpack(">H", await reader.readexactly(2))[0]
+
+    # Reply with a domain bound address to exercise every branch of the client
+    writer.write(b"\x05\x00\x00\x03\x05proxy\x00\x00")
+    await open_tunnel(host, port, reader, writer)
+
+
+async def http(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    request = (await reader.readuntil(b"\r\n\r\n")).decode()
+    authority = request.split(" ")[1]
+    credentials = base64.b64encode(f"{USERNAME}:{PASSWORD}".encode()).decode()
+
+    if f"Proxy-Authorization: Basic {credentials}" not in request:
+        writer.write(b"HTTP/1.1 407 Proxy Authentication Required\r\n\r\n")
+        return writer.close()
+
+    writer.write(b"HTTP/1.1 200 Connection established\r\nProxy-Agent: test\r\n\r\n")
+    host, port = authority.rsplit(":", 1)
+    await open_tunnel(host.strip("[]"), int(port), reader, writer)
+
+
+async def echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    await reader.readexactly(4)
+    await relay(reader, writer)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("scheme", ["socks4", "socks5", "http"])
+async def test_proxy(scheme):
+    handlers = {"socks4": socks4, "socks5": socks5, "http": http}
+
+    target = await asyncio.start_server(echo, "127.0.0.1", 0)
+    proxy = await asyncio.start_server(handlers[scheme], "127.0.0.1", 0)
+
+    settings = dict(
+        scheme=scheme,
+        hostname="127.0.0.1",
+        port=proxy.sockets[0].getsockname()[1],
+        username=USERNAME,
+        password=PASSWORD
+    )
+
+    # Many clients can go through the proxy at the same time, none of them blocking the event loop
+    connections = [TCPIntermediate(False, settings) for _ in range(100)]
+    await asyncio.gather(*(c.connect(target.sockets[0].getsockname()) for c in connections))
+
+    packets = [os.urandom(64) for _ in connections]
+    await asyncio.gather(*(c.send(p) for c, p in zip(connections, packets)))
+
+    assert await asyncio.gather(*(c.recv() for c in connections)) == packets
+
+    # Wrong credentials are refused
+    settings["password"] = settings["username"] = "wrong"
+    connection = TCPIntermediate(False, settings)
+
+    with pytest.raises(ConnectionError):
+        await connection.connect(target.sockets[0].getsockname())
+
+    for c in connections:
+        c.close()
+
+    for server in (proxy, target):
+        server.close()
+        await server.wait_closed()
+
+    await asyncio.sleep(0.01)
@@ -0,0 +1,101 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+
+import pytest
+
+from pyrogram.connection.transport import TCP, TCPAbridged, TCPFull, TCPIntermediate
+
+# Bytes each framing sends once connected, before the first packet
+PREAMBLES = {TCPAbridged: 1, TCPFull: 0, TCPIntermediate: 4}
+
+
+async def start_echo_server(preamble: int = 0, chunk_size: int = 1000):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        await reader.readexactly(preamble)
+
+        # Echo back in small chunks, so that frames arrive split across many reads
+        while data := await reader.read(chunk_size):
+            writer.write(data)
+            await writer.drain()
+            await asyncio.sleep(0)
+
+        writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+
+    return server, server.sockets[0].getsockname()
+
+
+async def stop(tcp: TCP, server: asyncio.AbstractServer):
+    tcp.close()
+    server.close()
+    await server.wait_closed()
+
+    # Let the echo handler see the connection going away
+    await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("mode", [TCPAbridged, TCPFull, TCPIntermediate])
+async def test_framing(mode):
+    server, address = await start_echo_server(PREAMBLES[mode])
+    tcp = mode(False, None)
+    await tcp.connect(address)
+
+    packets = [os.urandom(n * 4) for n in (1, 126, 127, 5000, 300_000)]
+
+    for packet in packets:
+        await tcp.send(packet)
+
+    for packet in packets:
+        assert await tcp.recv() == packet
+
+    await stop(tcp, server)
+
+
+@pytest.mark.asyncio
+async def test_recv():
+    server, address = await start_echo_server(chunk_size=7)
+    tcp = TCP(False, None)
+    await tcp.connect(address)
+
+    await tcp.send(b"hello ", b"world")
+
+    assert await tcp.recv(5) == b"hello"
+    assert await tcp.recv(0) == b""
+    assert await tcp.recv(6) == b" world"
+
+    # The connection is closed while waiting for more data
+    await stop(tcp, server)
+    assert await tcp.recv(1) is None
+
+
+@pytest.mark.asyncio
+async def test_idle_timeout(monkeypatch):
+    monkeypatch.setattr(TCP, "TIMEOUT", 0.1)
+
+    server, address = await start_echo_server()
+    tcp = TCP(False, None)
+    await tcp.connect(address)
+
+    assert await tcp.recv(1) is None
+
+    await stop(tcp, server)
@@ -0,0 +1,89 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from hashlib import sha1, sha256
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.crypto import aes, mtproto
+from pyrogram.errors import SecurityCheckMismatch
+from pyrogram.raw.core import Int, Long, Message, MsgContainer, Vector
+
+auth_key = os.urandom(256)
+auth_key_id = sha1(auth_key).digest()[-8:]
+context = mtproto.CryptoContext(auth_key)
+session_id = os.urandom(8)
+
+
+def server_pack(message: bytes) -> bytes:
+    # Same as mtproto.pack, but using the server side (incoming) keys
+    data = Long(0) + session_id + message
+    padding = os.urandom(-(len(data) + 12) % 16 + 12)
+
+    msg_key = sha256(auth_key[96:96 + 32] + data + padding).digest()[8:24]
+    aes_key, aes_iv = mtproto.kdf(auth_key, msg_key, False)
+
+    return auth_key_id + msg_key + aes.ige256_encrypt(data + padding, aes_key, aes_iv)
+
+
+def test_unpack_container():
+    pong = raw.types.RpcResult(req_msg_id=4, result=raw.types.Pong(msg_id=4, ping_id=0))
+    ack = raw.types.MsgsAck(msg_ids=[1, 2, 3])
+
+    container = MsgContainer([
+        Message(pong, 5, 1, len(pong)),
+        Message(ack, 9, 2, len(ack))
+    ])
+
+    message = mtproto.unpack(
+        server_pack(Message(container, 13, 2, len(container)).write()),
+        session_id, context
+    )
+
+    assert message.msg_id == 13
+    assert [m.body for m in message.body.messages] == [pong, ack]
+
+
+def test_unpack_rpc_result_bare_vector():
+    body = Int(raw.types.RpcResult.ID, False) + Long(4) + Vector([1, 2, 3], Int)
+
+    message = mtproto.unpack(
+        server_pack(Long(5) + Int(1) + Int(len(body)) + body),
+        session_id, context
+    )
+
+    assert message.body.result == [1, 2, 3]
+
+
+def test_unpack_wrong_session_id():
+    pong = raw.types.Pong(msg_id=4, ping_id=0)
+
+    with pytest.raises(SecurityCheckMismatch):
+        mtproto.unpack(
+            server_pack(Message(pong, 5, 1, len(pong)).write()),
+            os.urandom(8), context
+        )
+
+
+def test_context_kdf():
+    msg_key = os.urandom(16)
+
+    assert context.kdf(msg_key, True) == mtproto.kdf(auth_key, msg_key, True)
+    assert context.kdf(msg_key, False) == mtproto.kdf(auth_key, msg_key, False)
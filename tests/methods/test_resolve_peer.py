@@ -0,0 +1,82 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import Client, raw
+from pyrogram.errors import UsernameNotOccupied
+
+
+async def get_client():
+    client = Client("test", api_id=1, api_hash="test", in_memory=True)
+    await client.storage.open()
+    client.is_connected = True
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_concurrent_lookups_share_a_request():
+    client = await get_client()
+    calls = []
+
+    async def invoke(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+        await client.peer_cache.update_peers([(1, 10, "user", ["someone"], None)])
+        return raw.types.contacts.ResolvedPeer(peer=raw.types.PeerUser(user_id=1), chats=[], users=[])
+
+    client.invoke = invoke
+
+    peers = await asyncio.gather(*(client.resolve_peer(u) for u in ("someone", "@someone", "SomeOne")))
+
+    assert peers == [raw.types.InputPeerUser(user_id=1, access_hash=10)] * 3
+    assert len(calls) == 1
+    assert client.resolve_peer_tasks == {}
+
+    await client.storage.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_are_cached():
+    client = await get_client()
+    calls = []
+
+    async def invoke(query):
+        calls.append(query)
+        raise UsernameNotOccupied
+
+    client.invoke = invoke
+
+    for _ in range(3):
+        with pytest.raises(UsernameNotOccupied):
+            await client.resolve_peer("nobody")
+
+    assert len(calls) == 1
+
+    # Once the failure expires the server is asked again
+    client.resolve_peer_failures["nobody"] = (UsernameNotOccupied(), 0)
+
+    with pytest.raises(UsernameNotOccupied):
+        await client.resolve_peer("nobody")
+
+    assert len(calls) == 2
+
+    await client.storage.close()
@@ -0,0 +1,145 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import Client, raw
+from pyrogram.errors import PeerIdInvalid
+
+
+async def get_client():
+    client = Client("test", api_id=1, api_hash="test", in_memory=True)
+    await client.storage.open()
+    client.is_connected = True
+
+    return client
+
+
+@pytest.mark.asyncio
+async def test_resolve_peers():
+    client = await get_client()
+    await client.peer_cache.update_peers([
+        (1, 10, "user", ["one"], None),
+        (-1000000000001, 30, "channel", None, None)
+    ])
+
+    calls = []
+
+    async def invoke(query):
+        calls.append(query)
+
+        if isinstance(query, raw.functions.users.GetUsers):
+            await client.peer_cache.update_peers([(i.user_id, i.user_id * 10, "user", None, None) for i in query.id])
+            return []
+
+        await client.peer_cache.update_peers([
+            (-1000000000000 - i.channel_id, i.channel_id * 10, "channel", None, None) for i in query.id
+        ])
+        return raw.types.messages.Chats(chats=[])
+
+    client.invoke = invoke
+    client.fetch_peers = lambda peers: client.peer_cache.update_peers([])
+
+    user_ids = list(range(2, 252))
+    peers = await client.resolve_peers([1, "one", -1000000000001, -1000000000002, *user_ids])
+
+    assert peers[:4] == [
+        raw.types.InputPeerUser(user_id=1, access_hash=10),
+        raw.types.InputPeerUser(user_id=1, access_hash=10),
+        raw.types.InputPeerChannel(channel_id=1, access_hash=30),
+        raw.types.InputPeerChannel(channel_id=2, access_hash=20)
+    ]
+    assert peers[4:] == [raw.types.InputPeerUser(user_id=i, access_hash=i * 10) for i in user_ids]
+
+    # Known peers are not asked for, the unknown ones are asked in chunks, one request type at a time
+    assert [type(i) for i in calls] == [
+        raw.functions.users.GetUsers,
+        raw.functions.users.GetUsers,
+        raw.functions.channels.GetChannels
+    ]
+    assert [len(i.id) for i in calls] == [200, 50, 1]
+
+    await client.storage.close()
+
+
+@pytest.mark.asyncio
+async def test_resolve_peers_invalid():
+    client = await get_client()
+
+    async def invoke(query):
+        return []
+
+    client.invoke = invoke
+    client.fetch_peers = invoke
+
+    with pytest.raises(PeerIdInvalid):
+        await client.resolve_peers([1, 2])
+
+    await client.storage.close()
+
+
+@pytest.mark.asyncio
+async def test_resolve_peers_shared_and_failures():
+    client = await get_client()
+    calls = []
+
+    async def invoke(query):
+        calls.append(query)
+        await asyncio.sleep(0.01)
+
+        # Only even ids exist
+        await client.peer_cache.update_peers([
+            (i.user_id, i.user_id * 10, "user", None, None) for i in query.id if i.user_id % 2 == 0
+        ])
+        return []
+
+    client.invoke = invoke
+    client.fetch_peers = lambda peers: client.peer_cache.update_peers([])
+
+    # Concurrent lookups of the same ids share the requests, each id is asked for once
+    first, second, single = await asyncio.gather(
+        client.resolve_peers([2, 4]),
+        client.resolve_peers([4, 2]),
+        client.resolve_peer(2)
+    )
+
+    assert first == second[::-1] == [
+        raw.types.InputPeerUser(user_id=2, access_hash=20),
+        raw.types.InputPeerUser(user_id=4, access_hash=40)
+    ]
+    assert single == first[0]
+    assert sorted(i.user_id for query in calls for i in query.id) == [2, 4]
+
+    calls.clear()
+
+    with pytest.raises(PeerIdInvalid):
+        await client.resolve_peers([6, 7])
+
+    assert 7 in client.resolve_peer_failures
+
+    # The invalid id is not asked for again, whether alone or along with others
+    for resolve in [client.resolve_peers([7]), client.resolve_peers([8, 7]), client.resolve_peer(7)]:
+        with pytest.raises(PeerIdInvalid):
+            await resolve
+
+    assert len(calls) == 1
+    assert client.resolve_peer_tasks == {}
+
+    await client.storage.close()
@@ -0,0 +1,51 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import subprocess
+import sys
+
+import pytest
+
+SCRIPT = """
+import sys
+
+import pyrogram
+
+print(len([m for m in sys.modules if m.startswith("pyrogram.raw.")]))
+"""
+
+
+def test_import_loads_few_raw_modules():
+    # Importing pyrogram must not import the thousands of generated raw modules, only the few that are actually used
+    raw_modules = int(subprocess.run(
+        [sys.executable, "-c", SCRIPT],
+        capture_output=True, check=True, text=True
+    ).stdout)
+
+    assert raw_modules < 500
+
+
+def test_lazy_attributes():
+    from pyrogram import raw
+
+    assert raw.types.messages.Messages.QUALNAME == "types.messages.Messages"
+    assert raw.functions.Ping.QUALNAME == "functions.Ping"
+    assert "Message" in dir(raw.types)
+
+    with pytest.raises(AttributeError):
+        raw.types.ThisDoesNotExist
@@ -0,0 +1,158 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+from io import BytesIO
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.raw.core import Int, LazyList, Long, TLObject, Vector
+
+
+def messages_blob(count: int, chats: int = 0) -> bytes:
+    return raw.types.messages.Messages(
+        messages=[
+            raw.types.Message(
+                id=i,
+                peer_id=raw.types.PeerUser(user_id=i),
+                date=0,
+                message="Hello, world!",
+                entities=[
+                    raw.types.MessageEntityBold(offset=0, length=5),
+                    raw.types.MessageEntityItalic(offset=7, length=5)
+                ]
+            )
+            for i in range(count)
+        ],
+        chats=[
+            raw.types.ChatForbidden(id=i, title="Chat")
+            for i in range(chats)
+        ],
+        users=[
+            raw.types.User(id=i, access_hash=i, first_name="User")
+            for i in range(count)
+        ]
+    ).write()
+
+
+def test_typed_vectors():
+    assert Vector.read(BytesIO(Int(2) + Int(1) + Int(2)), Int) == [1, 2]
+    assert Vector.read(BytesIO(Int(2) + Long(1) + Long(2)), Long) == [1, 2]
+
+
+def test_bare_vectors():
+    assert TLObject.read(BytesIO(Vector([1, 2, 3], Int))) == [1, 2, 3]
+    assert TLObject.read(BytesIO(Vector([1, 2, 3], Long))) == [1, 2, 3]
+
+
+def test_object_vectors_of_small_constructors():
+    # Each element is 4 bytes long, bare vectors would mistake them for ints
+    rules = raw.types.account.PrivacyRules(
+        rules=[raw.types.PrivacyValueAllowAll(), raw.types.PrivacyValueDisallowContacts()],
+        chats=[],
+        users=[]
+    )
+
+    assert TLObject.read(BytesIO(rules.write())) == rules
+
+
+def test_decode_messages():
+    blob = messages_blob(10)
+    messages = TLObject.read(BytesIO(blob))
+
+    assert len(messages.messages) == 10
+    assert messages.messages[9].entities[1].offset == 7
+    assert messages.users[9].access_hash == 9
+
+
+@pytest.fixture
+def lazy_decode():
+    TLObject.LAZY_DECODE = True
+    yield
+    TLObject.LAZY_DECODE = False
+
+
+def test_lazy_decode(lazy_decode):
+    blob = messages_blob(10)
+    messages = TLObject.read(BytesIO(blob))
+
+    assert isinstance(messages.users, LazyList)
+    assert len(messages.users) == 10
+    assert messages.users.items is None  # Nothing decoded yet
+
+    assert messages.users[9].access_hash == 9
+    assert len(messages.users.items) == 10
+    assert messages.messages[9].entities[1].offset == 7
+    assert messages.chats == []
+
+    TLObject.LAZY_DECODE = False
+    assert TLObject.read(BytesIO(blob)) == messages
+
+
+def test_lazy_decode_str(lazy_decode):
+    messages = TLObject.read(BytesIO(messages_blob(2)))
+
+    assert '"first_name": "User"' in str(messages)
+
+
+def test_lazy_decode_list_operations(lazy_decode):
+    messages = TLObject.read(BytesIO(messages_blob(1, chats=1)))
+
+    assert [i.id for i in messages.users + messages.chats] == [0, 0]
+    assert [type(i) for i in [1] + messages.users] == [int, raw.types.User]
+    assert list(messages.chats) == [raw.types.ChatForbidden(id=0, title="Chat")]
+    assert messages.users[:1] == [messages.users[0]]
+    assert messages.users[1:] == []
+
+
+def test_lazy_decode_nested_json(lazy_decode):
+    messages = TLObject.read(BytesIO(messages_blob(1)))
+
+    # A lazy list reached through plain containers, not directly as an attribute of an object
+    dump = json.loads(json.dumps({"result": [messages.messages]}, default=TLObject.default))
+
+    assert dump["result"][0][0]["entities"][1]["offset"] == 7
+
+
+def test_lazy_decode_keeps_vector_bytes_only(lazy_decode):
+    blob = messages_blob(1)
+    messages = TLObject.read(BytesIO(blob))
+
+    assert len(messages.users.data) < len(blob)
+
+
+def test_skip():
+    blob = messages_blob(10) + Int(123)
+    b = BytesIO(blob)
+
+    TLObject.skip(b)
+
+    assert Int.read(b) == 123
+
+
+def test_no_size_guessing(monkeypatch):
+    # Guessing the size of the elements from the rest of the stream made decoding quadratic for nested vectors
+    def read_bare(*args):
+        raise AssertionError("Vector element type not passed")
+
+    monkeypatch.setattr(Vector, "read_bare", read_bare)
+
+    messages = TLObject.read(BytesIO(messages_blob(100)))
+
+    assert messages.messages[99].entities[1].offset == 7
@@ -0,0 +1,85 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.session.internals import DataCenter, DataCenterManager
+from pyrogram.storage import MemoryStorage
+
+
+def dc_option(dc_id, ip_address, ipv6=False, media_only=False, cdn=False, tcpo_only=False):
+    return raw.types.DcOption(
+        id=dc_id, ip_address=ip_address, port=443,
+        ipv6=ipv6, media_only=media_only, cdn=cdn, tcpo_only=tcpo_only
+    )
+
+
+@pytest.mark.asyncio
+async def test_data_center_manager():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    manager = DataCenterManager(storage)
+    await manager.load()
+
+    # Nothing learnt yet, the built-in addresses are used
+    assert manager.get_addresses(2, False, False) == [DataCenter(2, False, False, False)]
+    assert manager.get_addresses(201, False, False) == []
+
+    # The built-in CDN data center is reachable before any address is learnt
+    assert manager.get_addresses(203, False, False, cdn=True) == [DataCenter(203, False, False, False)]
+
+    await manager.update([
+        dc_option(2, "10.0.0.1"),
+        dc_option(2, "10.0.0.2", media_only=True),
+        dc_option(2, "::1", ipv6=True),
+        dc_option(2, "10.0.0.3", tcpo_only=True),
+        dc_option(201, "10.0.0.4", cdn=True)
+    ], False)
+
+    builtin_v4 = DataCenter(2, False, False, False)
+    builtin_v6 = DataCenter(2, False, True, False)
+
+    assert manager.get_addresses(2, False, False) == [("10.0.0.1", 443), builtin_v4]
+    assert manager.get_addresses(2, False, False, media=True)[:2] == [("10.0.0.2", 443), ("10.0.0.1", 443)]
+    assert manager.get_addresses(201, False, False, cdn=True) == [("10.0.0.4", 443)]
+
+    # CDN addresses are only used for CDN data centers
+    assert manager.get_addresses(201, False, False) == []
+
+    # IPv6 and IPv4 addresses alternate
+    assert manager.get_addresses(2, False, True) == [("::1", 443), ("10.0.0.1", 443), builtin_v6, builtin_v4]
+
+    # The fastest address goes first
+    manager.report(2, False, False, builtin_v4)
+    assert manager.get_addresses(2, False, True)[0] == builtin_v4
+
+    # Test servers have their own addresses, learning them keeps the production ones
+    await manager.update([dc_option(2, "10.1.0.1")], True)
+
+    assert manager.get_addresses(2, True, False) == [("10.1.0.1", 443), DataCenter(2, True, False, False)]
+    assert set(manager.get_addresses(2, False, False)) == {("10.0.0.1", 443), builtin_v4}
+
+    # The addresses are cached in the storage
+    manager = DataCenterManager(storage)
+    await manager.load()
+    assert manager.get_addresses(201, False, False, cdn=True) == [("10.0.0.4", 443)]
+    assert manager.get_addresses(2, True, False)[0] == ("10.1.0.1", 443)
+
+    await storage.close()
@@ -0,0 +1,200 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+from io import BytesIO
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.crypto import mtproto
+from pyrogram.raw.core import Long, Message, MsgContainer, TLObject
+from pyrogram.session import Session
+from pyrogram.session.internals import MsgId
+
+
+class FakeClient:
+    ipv6 = False
+    proxy = None
+    dc_manager = None
+    disconnect_handler = None
+    sleep_threshold = 10
+    device_model = app_version = system_version = lang_code = "test"
+
+
+class FakeConnection:
+    session = None
+    instances = []
+    connect_delay = 0
+
+    def __init__(self, *args, **kwargs):
+        self.packets = asyncio.Queue()
+        self.sent = []
+
+        FakeConnection.instances.append(self)
+
+    async def connect(self):
+        await asyncio.sleep(self.connect_delay)
+
+    def close(self):
+        self.packets.put_nowait(None)
+
+    async def send(self, payload: bytes):
+        body = TLObject.read(BytesIO(payload[16:]))
+        if isinstance(body, MsgContainer):
+            messages = body.messages
+        else:
+            messages = [Message(body, Long.read(BytesIO(payload)), 0, 0)]
+
+        for message in messages:
+            self.sent.append((message.msg_id, message.body))
+
+            # Answer pings right away, so that the session can start
+            if isinstance(message.body, raw.functions.Ping):
+                result = self.session.results[message.msg_id]
+                result.value = raw.types.Pong(msg_id=message.msg_id, ping_id=0)
+                result.event.set()
+
+    async def recv(self):
+        return await self.packets.get()
+
+
+@pytest.mark.asyncio
+async def test_reconnect(monkeypatch):
+    monkeypatch.setattr("pyrogram.session.session.Connection", FakeConnection)
+    monkeypatch.setattr(mtproto, "pack", lambda payload, *args: payload)
+    monkeypatch.setattr(Session, "BACKOFF_BASE_DELAY", 0.01)
+
+    session = Session(FakeClient(), 2, bytes(256), False, is_cdn=True)
+    FakeConnection.session = session
+    FakeConnection.instances.clear()
+
+    await session.start()
+
+    lost = asyncio.ensure_future(session.send(raw.functions.help.GetConfig(), timeout=5))
+    acked = asyncio.ensure_future(session.send(raw.functions.help.GetNearestDc(), timeout=5))
+    await asyncio.sleep(0.01)
+
+    sent = {type(body): msg_id for msg_id, body in FakeConnection.instances[0].sent}
+
+    # The server acknowledges one of the two requests, then the connection drops
+    ack = Message(raw.types.MsgsAck(msg_ids=[sent[raw.functions.help.GetNearestDc]]), MsgId(), 0, 0)
+    monkeypatch.setattr(mtproto, "unpack", lambda *args: ack)
+    await session.handle_packet(b"")
+
+    FakeConnection.instances[0].packets.put_nowait(None)
+
+    while session.reconnects == 0:
+        await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.01)
+
+    # Only the request the server didn't acknowledge is sent again, with a new msg_id
+    resent = [
+        (msg_id, body) for msg_id, body in FakeConnection.instances[-1].sent
+        if not isinstance(body, raw.functions.Ping)
+    ]
+    assert [type(body) for _, body in resent] == [raw.functions.help.GetConfig]
+    assert resent[0][0] != sent[raw.functions.help.GetConfig]
+
+    assert not lost.done() and not acked.done()
+    assert session.last_reconnect_duration is not None
+
+    # Results are delivered to the waiting requests, whatever msg_id they answer to
+    for msg_id, value in [(resent[0][0], "config"), (sent[raw.functions.help.GetNearestDc], "nearest_dc")]:
+        session.results[msg_id].value = value
+        session.results[msg_id].event.set()
+
+    assert await lost == "config"
+    assert await acked == "nearest_dc"
+    assert session.results == {}
+
+    await session.stop()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_slower_than_timeout(monkeypatch):
+    monkeypatch.setattr("pyrogram.session.session.Connection", FakeConnection)
+    monkeypatch.setattr(FakeConnection, "connect_delay", 0)
+    monkeypatch.setattr(mtproto, "pack", lambda payload, *args: payload)
+    monkeypatch.setattr(Session, "BACKOFF_BASE_DELAY", 0.01)
+
+    session = Session(FakeClient(), 2, bytes(256), False, is_cdn=True)
+    FakeConnection.session = session
+    FakeConnection.instances.clear()
+
+    await session.start()
+
+    request = asyncio.ensure_future(session.send(raw.functions.help.GetConfig(), timeout=0.1))
+    await asyncio.sleep(0.01)
+
+    # The connection drops and takes longer to come back than the request is waited for
+    monkeypatch.setattr(FakeConnection, "connect_delay", 0.3)
+    FakeConnection.instances[0].packets.put_nowait(None)
+
+    with pytest.raises(TimeoutError):
+        await request
+
+    while session.reconnects == 0:
+        await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.01)
+
+    # The caller gave up on the request, it is neither sent again nor left behind
+    assert not any(
+        isinstance(body, raw.functions.help.GetConfig)
+        for _, body in FakeConnection.instances[-1].sent
+    )
+    assert session.results == {}
+
+    await session.stop()
+
+
+@pytest.mark.asyncio
+async def test_send_without_connection(monkeypatch):
+    monkeypatch.setattr("pyrogram.session.session.Connection", FakeConnection)
+    monkeypatch.setattr(mtproto, "pack", lambda payload, *args: payload)
+
+    session = Session(FakeClient(), 2, bytes(256), False, is_cdn=True)
+    FakeConnection.session = session
+
+    # Never started, then stopped: nothing would send the message
+    with pytest.raises(OSError, match="Session not started"):
+        await asyncio.wait_for(session.send(raw.functions.help.GetConfig(), timeout=1), 0.5)
+
+    await session.start()
+    await session.stop()
+
+    with pytest.raises(OSError, match="Session not started"):
+        await asyncio.wait_for(session.send(raw.functions.help.GetConfig(), timeout=1), 0.5)
+
+    # While reconnecting the message waits for the next send worker, no longer than the timeout
+    session.is_reconnecting = True
+
+    with pytest.raises(TimeoutError):
+        await asyncio.wait_for(session.send(raw.functions.help.GetConfig(), timeout=0.1), 0.5)
+
+    assert session.results == {}
+
+
+def test_backoff_delay():
+    session = Session(FakeClient(), 2, bytes(256), False)
+
+    assert all(0.25 <= session.get_backoff_delay(0) <= 0.5 for _ in range(100))
+    assert all(1 <= session.get_backoff_delay(2) <= 2 for _ in range(100))
+    assert all(15 <= session.get_backoff_delay(100) <= 30 for _ in range(100))
@@ -0,0 +1,89 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.session import Session, SessionPool
+
+
+class FakeSession:
+    def __init__(self, client, dc_id, auth_key, test_mode, receive_updates=True):
+        self.receive_updates = receive_updates
+        self.is_connected = asyncio.Event()
+        self.queries = []
+
+    async def start(self):
+        self.is_connected.set()
+
+    async def stop(self):
+        self.is_connected.clear()
+
+    async def invoke(self, query, retries, timeout, sleep_threshold):
+        self.queries.append(query)
+        await asyncio.sleep(query.ping_id / 100)
+        return query.ping_id
+
+
+@pytest.mark.asyncio
+async def test_session_pool(monkeypatch):
+    monkeypatch.setattr("pyrogram.session.session_pool.Session", FakeSession)
+
+    pool = SessionPool(None, 2, b"", False, 3)
+    await pool.start()
+
+    assert [s.receive_updates for s in pool.sessions] == [True, False, False]
+
+    # A slow request keeps its session busy, the following ones go to the others
+    slow = asyncio.ensure_future(pool.invoke(raw.functions.Ping(ping_id=20)))
+    await asyncio.sleep(0)
+
+    assert await asyncio.gather(*[pool.invoke(raw.functions.Ping(ping_id=1)) for _ in range(2)]) == [1] * 2
+    assert await slow == 20
+
+    assert [len(s.queries) for s in pool.sessions] == [1, 1, 1]
+    assert pool.in_flight == [0, 0, 0]
+
+    # Disconnected sessions are skipped
+    await pool.sessions[0].stop()
+    await pool.invoke(raw.functions.Ping(ping_id=0))
+    await pool.invoke(raw.functions.Ping(ping_id=0))
+
+    assert [len(s.queries) for s in pool.sessions] == [1, 3, 1]
+
+    await pool.stop()
+    assert not pool.is_connected.is_set()
+
+
+@pytest.mark.asyncio
+async def test_session_without_updates():
+    session = Session(None, 2, bytes(256), False, receive_updates=False)
+    sent = []
+
+    async def send(query, wait_response=True, timeout=None):
+        sent.append(query)
+
+    session.send = send
+    session.is_connected.set()
+    session.client = type("Client", (), {"sleep_threshold": 10})()
+
+    await session.invoke(raw.functions.help.GetConfig())
+
+    assert sent == [raw.functions.InvokeWithoutUpdates(query=raw.functions.help.GetConfig())]
@@ -0,0 +1,90 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import bisect
+
+from pyrogram.session.internals import StoredMsgIds
+
+
+def test_contains_and_min():
+    stored = StoredMsgIds(10)
+
+    for msg_id in [5, 1, 9, 3]:
+        stored.add(msg_id)
+
+    assert len(stored) == 4
+    assert stored.min == 1
+    assert 9 in stored
+    assert 2 not in stored
+
+
+def test_duplicates_are_ignored():
+    stored = StoredMsgIds(10)
+
+    stored.add(7)
+    stored.add(7)
+
+    assert len(stored) == 1
+
+
+def test_evicts_lowest_half():
+    stored = StoredMsgIds(10)
+
+    for msg_id in range(11, 0, -1):
+        stored.add(msg_id)
+
+    assert len(stored) == 6
+    assert stored.min == 6
+    assert 5 not in stored
+    assert 11 in stored
+
+
+def test_matches_sorted_list():
+    max_size = 100
+    stored = StoredMsgIds(max_size)
+    expected = []
+
+    for i in range(1000):
+        msg_id = (i * 7919) % 1009
+
+        if msg_id in expected:
+            continue
+
+        bisect.insort(expected, msg_id)
+        stored.add(msg_id)
+
+        if len(expected) > max_size:
+            del expected[:max_size // 2]
+
+        assert stored.min == expected[0]
+        assert set(expected) == stored.ids
+
+
+def test_large_window():
+    max_size = 100_000
+    stored = StoredMsgIds(max_size)
+
+    # Ids arriving out of order, one more than the window holds
+    for i in range(max_size + 1):
+        stored.add((i * 7919) % (max_size + 1))
+
+    # The lowest half was evicted at once, the newest ids are kept
+    assert len(stored) == len(stored.heap) == max_size // 2 + 1
+    assert stored.min == max_size // 2
+    assert max_size // 2 - 1 not in stored
+    assert max_size in stored
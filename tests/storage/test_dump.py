@@ -0,0 +1,110 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage import FileStorage, LogStorage, MemoryStorage, SharedDatabase, SharedStorage
+
+PEERS = [
+    (i, i * 10, "user", [f"user{i}", f"alias{i}"] if i % 2 else None, f"{i}" * 3 if i % 3 else None)
+    for i in range(1, 251)
+] + [(-1000000000001, 5, "channel", ["news"], None), (-7, 0, "group", None, None)]
+
+
+def normalize(peers):
+    # The order of the usernames of a peer isn't kept by every engine
+    return sorted((i, h, t, sorted(u) if u else None, p) for i, h, t, u, p in peers)
+
+
+async def check_copy(source, target):
+    await source.dc_id(4)
+    await source.auth_key(b"\x01" * 256)
+    await source.user_id(123)
+    await source.update_state((0, 10, None, 1, None))
+    await source.update_peers(PEERS)
+
+    batches = [batch async for batch in source.dump_peers(100)]
+
+    assert [len(batch) for batch in batches] == [100, 100, 52]
+    assert normalize(peer for batch in batches for peer in batch) == normalize(PEERS)
+
+    await source.copy_to(target, batch_size=100)
+
+    assert await target.dc_id() == 4
+    assert await target.auth_key() == b"\x01" * 256
+    assert await target.user_id() == 123
+    assert await target.update_state() == [(0, 10, None, 1, None)]
+
+    assert await target.get_peer_by_id(250) == raw.types.InputPeerUser(user_id=250, access_hash=2500)
+    assert await target.get_peer_by_username("alias249") == raw.types.InputPeerUser(user_id=249, access_hash=2490)
+    assert await target.get_peer_by_phone_number("111") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await target.get_peer_by_username("news") == raw.types.InputPeerChannel(channel_id=1, access_hash=5)
+    assert await target.get_peer_by_id(-7) == raw.types.InputPeerChat(chat_id=7)
+
+
+@pytest.mark.asyncio
+async def test_file_to_memory(tmp_path):
+    source = FileStorage("source", tmp_path, read_connections=1)
+    target = MemoryStorage("target")
+
+    await source.open()
+    await target.open()
+
+    await check_copy(source, target)
+
+    await source.close()
+    await target.close()
+
+
+@pytest.mark.asyncio
+async def test_log_to_file(tmp_path):
+    source = LogStorage("source", tmp_path)
+    target = FileStorage("target", tmp_path)
+
+    await source.open()
+    await target.open()
+
+    # Superseded records are not dumped
+    await source.update_peers([(1, 1, "bot", None, None)])
+    await check_copy(source, target)
+
+    await source.close()
+    await target.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_to_log(tmp_path):
+    database = SharedDatabase(tmp_path / "shared.db")
+    other = SharedStorage("other", database)
+    source = SharedStorage("source", database)
+    target = LogStorage("target", tmp_path)
+
+    await other.open()
+    await source.open()
+    await target.open()
+
+    await other.update_peers([(1000, 1, "user", None, None)])
+    await check_copy(source, target)
+
+    with pytest.raises(KeyError):
+        await target.get_peer_by_id(1000)
+
+    await other.close()
+    await source.close()
+    await target.close()
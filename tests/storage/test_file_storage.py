@@ -0,0 +1,189 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+import os
+import time
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage import FileStorage
+
+PROFILES = {
+    "default": {},
+    "full": {"synchronous": "FULL"},
+    "tuned": {"mmap_size": 64 * 1024 * 1024, "cache_size": -16 * 1024},
+    "readers": {"mmap_size": 64 * 1024 * 1024, "cache_size": -16 * 1024, "read_connections": 4},
+}
+
+@pytest.mark.asyncio
+async def test_read_connections(tmp_path):
+    storage = FileStorage("test", tmp_path, read_connections=2)
+    await storage.open()
+
+    await storage.update_peers([(1, 10, "user", ["one"], "111")])
+
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await storage.get_peer_by_username("one") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await storage.get_peer_by_phone_number("111") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    # Writes are visible to the readers as soon as they are committed
+    await storage.update_peers([(1, 11, "user", ["one"], "111")])
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=11)
+
+    with pytest.raises(KeyError):
+        await storage.get_peer_by_id(2)
+
+    await storage.close()
+
+    assert storage.read_conns == []
+
+
+@pytest.mark.asyncio
+async def test_pragmas(tmp_path):
+    storage = FileStorage(
+        "test", tmp_path,
+        synchronous="FULL", mmap_size=64 * 1024 * 1024, cache_size=-16 * 1024, read_connections=1
+    )
+    await storage.open()
+
+    def pragma(conn, name):
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+    assert pragma(storage.conn, "journal_mode") == "wal"
+    assert pragma(storage.conn, "synchronous") == 2
+
+    # The readers are tuned like the writer
+    reader = storage.read_executor.submit(storage._get_read_conn).result()
+
+    for conn in [storage.conn, reader]:
+        assert pragma(conn, "mmap_size") == 64 * 1024 * 1024
+        assert pragma(conn, "cache_size") == -16 * 1024
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.skipif(not os.environ.get("PYROGRAM_BENCHMARK"), reason="Set PYROGRAM_BENCHMARK=1 to run benchmarks")
+async def test_benchmark_profiles(tmp_path, profile):
+    # Opt-in, timings vary too much to be asserted: run with PYROGRAM_BENCHMARK=1 and -s to compare the profiles
+    peers = 5_000
+    storage = FileStorage("test", tmp_path, **PROFILES[profile])
+    await storage.open()
+
+    start = time.perf_counter()
+    for i in range(0, peers, 100):
+        await storage.update_peers([(j, j, "user", [f"user{j}"], None) for j in range(i + 1, i + 101)])
+    writes = peers / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*[storage.get_peer_by_id(i) for i in range(1, peers + 1)])
+    lookups = peers / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for pts in range(1, 501):
+        await storage.update_state((0, pts, None, pts, None))
+    updates = 500 / (time.perf_counter() - start)
+
+    assert results[-1] == raw.types.InputPeerUser(user_id=peers, access_hash=peers)
+    assert await storage.update_state() == [(0, 500, None, 500, None)]
+
+    print(
+        f"\n{profile}: {writes:.0f} peer writes/s, {lookups:.0f} peer lookups/s, "
+        f"{updates:.0f} update state writes/s"
+    )
+
+    await storage.close()
+
+
+def insert_peers(storage, peers):
+    def insert():
+        with storage.conn:
+            storage.conn.executemany(
+                "INSERT INTO peers (id, access_hash, type, phone_number, last_update_on) VALUES (?, ?, ?, ?, ?)",
+                [(id, id, type, phone_number, date) for id, type, phone_number, date in peers]
+            )
+            storage.conn.executemany(
+                "INSERT INTO usernames (id, username) VALUES (?, ?)",
+                [(id, f"user{id}") for id, *_ in peers]
+            )
+
+    storage.executor.submit(insert).result()
+
+
+@pytest.mark.asyncio
+async def test_prune_peers(tmp_path):
+    now = int(time.time())
+    day = 24 * 60 * 60
+
+    storage = FileStorage("test", tmp_path)
+    await storage.open()
+
+    storage.max_peers = 4
+    storage.max_peer_age = 30 * day
+
+    insert_peers(storage, [
+        (1, "user", None, now - 60 * day),  # Too old
+        (2, "user", "222", now - 60 * day),  # Too old, but a contact
+        (-1000000000003, "channel", None, now - 60 * day),  # Too old, but its updates are tracked
+        (4, "user", None, now - 10 * day),
+        (5, "user", None, now - 5 * day),
+        (6, "user", None, now - 4 * day),
+        (7, "user", None, now - 60),  # Beyond the limit, but recently updated
+    ])
+    await storage.update_state((-1000000000003, 1, None, now, None))
+
+    assert await storage.prune_peers() == 3
+
+    for peer_id in [1, 4, 5]:
+        with pytest.raises(KeyError):
+            await storage.get_peer_by_id(peer_id)
+
+    for peer_id in [2, -1000000000003, 6, 7]:
+        await storage.get_peer_by_id(peer_id)
+
+    assert storage.conn.execute("SELECT COUNT(*) FROM usernames").fetchone()[0] == 4
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_prune_worker_and_vacuum(tmp_path):
+    storage = FileStorage("test", tmp_path)
+    await storage.open()
+    insert_peers(storage, [(i, "user", None, 0) for i in range(1, 20001)])
+    await storage.close()
+
+    size = storage.database.stat().st_size
+
+    storage = FileStorage("test", tmp_path, max_peer_age=0)
+    await storage.open()
+
+    # Pruned in background as soon as the storage is opened, then vacuumed; the worker always completes a pass
+    # before it checks whether it's asked to stop
+    storage.prune_event.set()
+    await storage.prune_task
+
+    with pytest.raises(KeyError):
+        await storage.get_peer_by_id(1)
+
+    await storage.close()
+
+    assert storage.database.stat().st_size < size / 4
@@ -0,0 +1,248 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage import LogStorage
+from pyrogram.storage.log_storage import PeerIndex
+
+
+@pytest.mark.asyncio
+async def test_peers(tmp_path):
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    await storage.update_peers([
+        (1, 10, "user", ["one", "uno"], "111"),
+        (-1000000000002, 20, "channel", ["two"], None),
+        (-3, 0, "group", None, None)
+    ])
+
+    assert await storage.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await storage.get_peer_by_id(-3) == raw.types.InputPeerChat(chat_id=3)
+    assert await storage.get_peer_by_username("uno") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await storage.get_peer_by_username("two") == raw.types.InputPeerChannel(channel_id=2, access_hash=20)
+    assert await storage.get_peer_by_phone_number("111") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    # The username moved to another peer
+    await storage.update_peers([(4, 40, "bot", ["one"], None)])
+    assert await storage.get_peer_by_username("one") == raw.types.InputPeerUser(user_id=4, access_hash=40)
+
+    # The peer dropped a username and changed phone number, the new owner of the other one keeps it
+    await storage.update_peers([(1, 10, "user", ["eins"], "112")])
+    assert await storage.get_peer_by_username("one") == raw.types.InputPeerUser(user_id=4, access_hash=40)
+    assert await storage.get_peer_by_phone_number("112") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    for method, value in [(storage.get_peer_by_username, "uno"), (storage.get_peer_by_phone_number, "111")]:
+        with pytest.raises(KeyError):
+            await method(value)
+
+    for method, value in [
+        (storage.get_peer_by_id, 5),
+        (storage.get_peer_by_username, "five"),
+        (storage.get_peer_by_phone_number, "555")
+    ]:
+        with pytest.raises(KeyError):
+            await method(value)
+
+    await storage.close()
+
+
+def test_index_remove(tmp_path, monkeypatch):
+    monkeypatch.setattr(PeerIndex, "MIN_CAPACITY", 8)
+
+    index = PeerIndex(tmp_path / "index")
+    index.create(0)
+
+    # Keys sharing their home slot, and one whose home slot is taken by them
+    keys = [8, 16, 24, 9]
+
+    for offset, key in enumerate(keys, 1):
+        index.put(key, offset)
+
+    index.remove(16, 5)  # Moved to another offset, kept
+    assert index.find(16) == 2
+
+    index.remove(8, 1)
+    index.remove(24, 3)
+
+    assert [index.find(key) for key in keys] == [0, 2, 0, 4]
+    assert index.count == 2
+
+    index.close()
+
+
+@pytest.mark.asyncio
+async def test_session_and_update_state(tmp_path):
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    await storage.dc_id(4)
+    await storage.auth_key(b"\x01" * 256)
+    await storage.update_state((0, 10, None, 2, None))
+    await storage.update_state((-1000000000001, 20, None, 1, None))
+    await storage.update_state((-1000000000002, 30, None, 3, None))
+    await storage.update_state(-1000000000002)
+    await storage.save()
+    await storage.close()
+
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    assert await storage.dc_id() == 4
+    assert await storage.auth_key() == b"\x01" * 256
+    assert await storage.update_state() == [(-1000000000001, 20, None, 1, None), (0, 10, None, 2, None)]
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_index_growth_and_reopen(tmp_path, monkeypatch):
+    monkeypatch.setattr(PeerIndex, "MIN_CAPACITY", 16)
+
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+    await storage.update_peers([(i, i, "user", [f"user{i}"], None) for i in range(1, 1001)])
+    await storage.close()
+
+    assert storage.index.capacity >= 2000 / PeerIndex.MAX_LOAD
+
+    storage = LogStorage("test", tmp_path)
+    storage._rebuild_index_impl = None  # A cleanly closed index is used as it is
+
+    await storage.open()
+
+    assert await storage.get_peer_by_id(1000) == raw.types.InputPeerUser(user_id=1000, access_hash=1000)
+    assert await storage.get_peer_by_username("user500") == raw.types.InputPeerUser(user_id=500, access_hash=500)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_crash_recovery(tmp_path):
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+    await storage.update_peers([(1, 10, "user", ["one"], None), (2, 20, "user", ["two"], None)])
+
+    # Crash while appending a record: the index isn't closed cleanly and the log ends with half a record
+    storage._sync_impl()
+    size = storage.log_path.stat().st_size
+
+    with open(storage.log_path, "ab") as f:
+        f.write(b"\x01\x02\x03\x04\x05\x06\x07\x08\x09")
+
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    assert storage.log_path.stat().st_size == size
+    assert await storage.get_peer_by_id(2) == raw.types.InputPeerUser(user_id=2, access_hash=20)
+    assert await storage.get_peer_by_username("one") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_compaction(tmp_path):
+    storage = LogStorage("test", tmp_path)
+    storage.COMPACT_MIN_SIZE = 10_000
+    await storage.open()
+
+    for access_hash in range(100):
+        await storage.update_peers([(i, access_hash, "user", [f"user{i}"], None) for i in range(1, 11)])
+
+    # Without compaction the log would hold 1000 records, ~45 KB
+    assert storage.index.log_size == storage.log_path.stat().st_size < 25_000
+
+    assert await storage.get_peer_by_id(10) == raw.types.InputPeerUser(user_id=10, access_hash=99)
+    assert await storage.get_peer_by_username("user1") == raw.types.InputPeerUser(user_id=1, access_hash=99)
+
+    await storage.close()
+
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    assert await storage.get_peer_by_id(5) == raw.types.InputPeerUser(user_id=5, access_hash=99)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_compaction_waits_for_dump(tmp_path):
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    for access_hash in range(3):
+        await storage.update_peers([(i, access_hash, "user", None, None) for i in range(1, 11)])
+
+    dump = storage.dump_peers(batch_size=3)
+    peers = await dump.__anext__()
+
+    compaction = asyncio.ensure_future(storage.compact())
+    await asyncio.sleep(0.1)
+
+    # The log isn't compacted while it's being scanned
+    assert not compaction.done()
+
+    async for batch in dump:
+        peers += batch
+
+    await compaction
+
+    assert sorted(peer[0] for peer in peers) == list(range(1, 11))
+    assert {peer[1] for peer in peers} == {2}
+    assert storage.index.dead == 0
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_update_state_written_behind(tmp_path, monkeypatch):
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    writes = []
+    replace_file = LogStorage._replace_file_impl
+
+    def replace_file_impl(path, data, sync=True):
+        writes.append((path.name, sync))
+        replace_file(path, data, sync)
+
+    monkeypatch.setattr(LogStorage, "_replace_file_impl", staticmethod(replace_file_impl))
+
+    # A flush of many chats, as done by the update state tracker
+    for chat_id in range(100):
+        await storage.update_state((chat_id, 1, None, chat_id, None))
+
+    await asyncio.sleep(0.1)
+
+    # A single write, not synced to disk
+    assert writes == [("test.updates", False)]
+
+    await storage.close()
+
+    assert writes[-1] == ("test.updates", True)
+
+    storage = LogStorage("test", tmp_path)
+    await storage.open()
+
+    assert len(await storage.update_state()) == 100
+
+    await storage.close()
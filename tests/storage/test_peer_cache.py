@@ -0,0 +1,91 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage import MemoryStorage, PeerCache
+
+
+@pytest.mark.asyncio
+async def test_peer_cache():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    cache = PeerCache(storage, 2)
+    await cache.update_peers([
+        (1, 10, "user", ["one"], "111"),
+        (2, 20, "user", None, None),
+        (-1000000000001, 30, "channel", ["three"], None)
+    ])
+
+    queries = []
+    storage.executor.submit(storage.conn.set_trace_callback, queries.append).result()
+
+    assert await cache.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await cache.get_peer_by_id(1) == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert len(queries) == 1
+
+    assert await cache.get_peer_by_username("three") == raw.types.InputPeerChannel(channel_id=1, access_hash=30)
+    assert await cache.get_peer_by_id(-1000000000001) == raw.types.InputPeerChannel(channel_id=1, access_hash=30)
+    assert await cache.get_peer_by_phone_number("111") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+    assert await cache.get_peer_by_username("three") == raw.types.InputPeerChannel(channel_id=1, access_hash=30)
+    assert len(queries) == 3
+
+    # Bounded: the least recently used peer was evicted
+    assert len(cache) == 2
+    await cache.get_peer_by_id(2)
+    assert 1 not in cache.peers
+
+    # Written peers are invalidated and read again with their new access hash
+    await cache.update_peers([(-1000000000001, 31, "channel", ["three"], None)])
+    assert await cache.get_peer_by_id(-1000000000001) == raw.types.InputPeerChannel(channel_id=1, access_hash=31)
+
+    with pytest.raises(KeyError):
+        await cache.get_peer_by_id(3)
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_peers_are_not_written():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    cache = PeerCache(storage, 10)
+    await cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "user", None, None)])
+
+    queries = []
+    storage.executor.submit(storage.conn.set_trace_callback, queries.append).result()
+
+    await cache.update_peers([(1, 10, "user", ["one"], None), (2, 20, "user", None, None)])
+    assert queries == []
+
+    await cache.update_peers([(1, 10, "user", ["uno"], None), (2, 20, "user", None, None)])
+    assert len([q for q in queries if q.startswith("REPLACE INTO peers")]) == 1
+
+    # Unchanged peers are written again once their fingerprint expires
+    queries.clear()
+    cache.FINGERPRINT_TTL = 0
+    await cache.update_peers([(2, 20, "user", None, None)])
+    assert len([q for q in queries if q.startswith("REPLACE INTO peers")]) == 1
+
+    assert await storage.get_peer_by_username("uno") == raw.types.InputPeerUser(user_id=1, access_hash=10)
+
+    await storage.close()
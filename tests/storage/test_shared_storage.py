@@ -0,0 +1,91 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram import raw
+from pyrogram.storage import SharedDatabase, SharedStorage
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_one_database(tmp_path):
+    database = SharedDatabase(tmp_path / "accounts.db")
+    first = SharedStorage("first", database)
+    second = SharedStorage("second", database)
+
+    await first.open()
+    await second.open()
+
+    assert first.conn is second.conn
+    assert database.users == 2
+
+    await first.dc_id(4)
+    await first.auth_key(b"\x01" * 256)
+    assert await second.dc_id() == 2
+    assert await second.auth_key() is None
+
+    await first.update_peers([(-1000000000001, 10, "channel", ["news"], None)])
+    await second.update_peers([(-1000000000001, 20, "channel", ["news"], None)])
+
+    # Access hashes are per account, usernames are stored once
+    assert await first.get_peer_by_username("news") == raw.types.InputPeerChannel(channel_id=1, access_hash=10)
+    assert await second.get_peer_by_username("news") == raw.types.InputPeerChannel(channel_id=1, access_hash=20)
+    assert database.conn.execute("SELECT COUNT(*) FROM usernames").fetchone()[0] == 1
+
+    await first.update_peers([(2, 30, "user", None, "222")])
+
+    assert await first.get_peer_by_phone_number("222") == raw.types.InputPeerUser(user_id=2, access_hash=30)
+
+    with pytest.raises(KeyError):
+        await second.get_peer_by_id(2)
+
+    await first.update_state((0, 1, None, 1, None))
+    assert await first.update_state() == [(0, 1, None, 1, None)]
+    assert await second.update_state() == []
+
+    # Each session caches the data center addresses it learnt
+    await first.dc_options([(2, "10.0.0.1", 443, False, False, False, False)])
+    await second.dc_options([(2, "10.1.0.1", 443, False, False, False, True)])
+    assert await first.dc_options() == [(2, "10.0.0.1", 443, False, False, False, False)]
+    assert await second.dc_options() == [(2, "10.1.0.1", 443, False, False, False, True)]
+
+    await first.save()
+    await first.close()
+    await second.close()
+
+    assert database.conn is None
+
+    first = SharedStorage("first", database)
+    await first.open()
+
+    assert await first.dc_id() == 4
+    assert await first.get_peer_by_id(2) == raw.types.InputPeerUser(user_id=2, access_hash=30)
+
+    await first.close()
+    await first.delete()
+
+    first = SharedStorage("first", database)
+    await first.open()
+
+    assert await first.auth_key() is None
+    assert await first.dc_options() == []
+
+    with pytest.raises(KeyError):
+        await first.get_peer_by_id(2)
+
+    await first.close()
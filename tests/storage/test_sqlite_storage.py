@@ -0,0 +1,61 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+from pyrogram.storage import FileStorage, MemoryStorage
+
+
+@pytest.mark.asyncio
+async def test_session_row_is_cached():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    queries = []
+    storage.executor.submit(storage.conn.set_trace_callback, queries.append).result()
+
+    assert await storage.dc_id() == 2
+    assert await storage.auth_key() is None
+    assert await storage.test_mode() is None
+    assert len([q for q in queries if "FROM sessions" in q]) == 1
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_session_row_is_written_through(tmp_path):
+    storage = FileStorage("test", tmp_path)
+    await storage.open()
+
+    assert await storage.dc_id() == 2
+
+    await storage.dc_id(4)
+    await storage.auth_key(b"\x01" * 256)
+
+    assert await storage.dc_id() == 4
+
+    await storage.save()
+    await storage.close()
+
+    storage = FileStorage("test", tmp_path)
+    await storage.open()
+
+    assert await storage.dc_id() == 4
+    assert await storage.auth_key() == b"\x01" * 256
+
+    await storage.close()
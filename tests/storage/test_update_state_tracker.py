@@ -0,0 +1,72 @@
+#  Pyrogram - Telegram MTProto API Client Library for Python
+#  Copyright (C) 2017-present Dan <https://github.com/delivrance>
+#
+#  This file is part of Pyrogram.
+#
+#  Pyrogram is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU Lesser General Public License as published
+#  by the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  Pyrogram is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU Lesser General Public License for more details.
+#
+#  You should have received a copy of the GNU Lesser General Public License
+#  along with Pyrogram.  If not, see <http://www.gnu.org/licenses/>.
+
+import asyncio
+
+import pytest
+
+from pyrogram.storage import MemoryStorage, UpdateStateTracker
+
+
+@pytest.mark.asyncio
+async def test_update_states_are_coalesced():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    tracker = UpdateStateTracker(storage)
+
+    for pts in range(1, 101):
+        tracker.update((0, pts, None, pts, None))
+        tracker.update((-1000000000001, pts * 2, None, pts, None))
+
+    assert await storage.update_state() == []
+
+    queries = []
+    storage.executor.submit(storage.conn.set_trace_callback, queries.append).result()
+
+    await tracker.flush()
+
+    assert len([q for q in queries if q.startswith("REPLACE")]) == 2
+    assert sorted(await storage.update_state()) == [(-1000000000001, 200, None, 100, None), (0, 100, None, 100, None)]
+
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_update_states_are_flushed_on_interval_and_stop():
+    storage = MemoryStorage("test")
+    await storage.open()
+
+    tracker = UpdateStateTracker(storage)
+    tracker.FLUSH_INTERVAL = 0.01
+    tracker.start()
+
+    tracker.update((0, 1, None, 1, None))
+    await asyncio.sleep(0.1)
+
+    assert await storage.update_state() == [(0, 1, None, 1, None)]
+
+    tracker.FLUSH_INTERVAL = 60
+    await asyncio.sleep(0.02)
+    tracker.update((0, 2, None, 2, None))
+    await tracker.stop()
+
+    assert tracker.task is None
+    assert await storage.update_state() == [(0, 2, None, 2, None)]
+
+    await storage.close()